@@ -0,0 +1,5 @@
+"""Shared helpers for the gallery's generative art scripts."""
+
+from artlib.canvas import Canvas, RecordingDraw, output_target
+
+__all__ = ["Canvas", "RecordingDraw", "output_target"]
@@ -0,0 +1,222 @@
+"""Render a script as a frame sequence.
+
+Scripts that support animation ask for the current animation and, when there
+is one, advance their state one step per frame and hand each frame to it
+instead of re-running from scratch::
+
+    animation = current_animation()
+    if animation is not None:
+        for frame in range(animation.frames):
+            ...  # advance one step, draw into the frame buffer
+            animation.put(buffer)
+
+Frames go through a bounded queue to writer threads, so encoding overlaps
+with drawing and at most ``queue_size`` frames are held in memory. The output
+is numbered PNGs in a directory, or a video piped raw into ffmpeg::
+
+    python -m artlib.animate scripts/flow_field.py -o frames/ --frames 240
+    python -m artlib.animate scripts/flow_field.py -o flow.mp4 --frames 240 --fps 30
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import click
+from gen_art_framework.executor import execute_script
+from PIL import Image
+
+from artlib.runner import load_parameter_space, parse_overrides, sample_parameters
+
+# Outputs with these suffixes are encoded with ffmpeg; anything else is a
+# directory of numbered PNGs.
+VIDEO_SUFFIXES = {".mp4", ".mov", ".mkv", ".webm"}
+
+DEFAULT_QUEUE_SIZE = 8
+
+# Marks the end of the frame stream for each writer thread.
+_DONE = object()
+
+
+class FrameWriter:
+    """Writes frames on background threads, fed through a bounded queue.
+
+    ``put`` blocks while the queue is full, so a producer that draws faster
+    than frames can be encoded is held back instead of piling frames up.
+    Pillow releases the GIL while compressing, so several PNG writers encode
+    in parallel; a video has a single writer feeding ffmpeg in order.
+
+    Args:
+        output: Directory for numbered PNGs, or a video file.
+        fps: Frame rate of a video output.
+        queue_size: Frames buffered between the producer and the writers.
+        writers: PNG writer threads (default: one per CPU, at most 4).
+    """
+
+    def __init__(
+        self,
+        output: Path | str,
+        fps: int = 30,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        writers: int | None = None,
+    ):
+        self.output = Path(output)
+        self.fps = fps
+        self.count = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._encoder: subprocess.Popen | None = None
+        self._error: BaseException | None = None
+        self._video = self.output.suffix.lower() in VIDEO_SUFFIXES
+        if self._video:
+            if shutil.which("ffmpeg") is None:
+                raise ValueError(f"ffmpeg is needed to write {self.output}")
+            self.output.parent.mkdir(parents=True, exist_ok=True)
+            writers = 1
+        else:
+            self.output.mkdir(parents=True, exist_ok=True)
+            writers = writers or min(4, os.cpu_count() or 1)
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(writers)]
+        for thread in self._threads:
+            thread.start()
+
+    def put(self, frame: Image.Image) -> None:
+        """Queue ``frame`` for writing. The writer owns it from here on."""
+        if self._error is not None:
+            raise self._error
+        self._queue.put((self.count, frame))
+        self.count += 1
+
+    def close(self) -> None:
+        """Flush the queued frames and wait for the writers to finish."""
+        for _ in self._threads:
+            self._queue.put(_DONE)
+        for thread in self._threads:
+            thread.join()
+        if self._encoder is not None:
+            self._encoder.stdin.close()
+            if self._encoder.wait() != 0 and self._error is None:
+                self._error = RuntimeError(f"ffmpeg failed writing {self.output}")
+        if self._error is not None:
+            raise self._error
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if self._error is not None:
+                # Keep draining so the producer never blocks on a dead writer
+                continue
+            index, frame = item
+            try:
+                self._write(index, frame.convert("RGB"))
+            except BaseException as e:
+                self._error = e
+
+    def _write(self, index: int, frame: Image.Image) -> None:
+        if not self._video:
+            frame.save(self.output / f"frame_{index:05d}.png", compress_level=1)
+            return
+        if self._encoder is None:
+            width, height = frame.size
+            self._encoder = subprocess.Popen(
+                [
+                    "ffmpeg", "-y", "-loglevel", "error",
+                    "-f", "rawvideo", "-pix_fmt", "rgb24",
+                    "-s", f"{width}x{height}", "-r", str(self.fps), "-i", "-",
+                    "-pix_fmt", "yuv420p", str(self.output),
+                ],
+                stdin=subprocess.PIPE,
+            )
+        self._encoder.stdin.write(frame.tobytes())
+
+
+class Animation:
+    """Frame count and sink handed to a script running inside ``animation``."""
+
+    def __init__(self, frames: int, writer: FrameWriter):
+        self.frames = frames
+        self.writer = writer
+
+    def put(self, frame: Image.Image) -> None:
+        self.writer.put(frame)
+
+
+_animation: Animation | None = None
+
+
+@contextmanager
+def animation(frames: int, writer: FrameWriter):
+    """Make scripts run inside the block render ``frames`` frames into ``writer``."""
+    global _animation
+    previous = _animation
+    _animation = Animation(frames, writer)
+    try:
+        yield _animation
+    finally:
+        _animation = previous
+
+
+def current_animation() -> Animation | None:
+    """The animation a script should render, or None for a still image."""
+    return _animation
+
+
+@click.command()
+@click.argument("script", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--output",
+    "-o",
+    required=True,
+    type=click.Path(path_type=Path),
+    help="Directory for numbered PNGs, or a video file (.mp4, .mov, .mkv, .webm).",
+)
+@click.option("--frames", "-f", default=120, type=click.IntRange(min=1), help="Number of frames.")
+@click.option("--fps", default=30, type=click.IntRange(min=1), help="Frame rate of a video output.")
+@click.option("--seed", "-s", default=0, type=int, help="Sample seed.")
+@click.option(
+    "--set",
+    "assignments",
+    multiple=True,
+    metavar="NAME=VALUE",
+    help="Override a parameter (value parsed as YAML). Repeatable.",
+)
+def main(script: Path, output: Path, frames: int, fps: int, seed: int, assignments: tuple[str, ...]):
+    """Render SCRIPT as an animation of FRAMES frames into OUTPUT."""
+    try:
+        params = sample_parameters(
+            load_parameter_space(script), seed, parse_overrides(assignments)
+        )
+        writer = FrameWriter(output, fps)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+
+    # Under ``python -m`` this module runs as __main__, a copy separate from
+    # the artlib.animate that scripts import
+    from artlib import animate
+
+    start = time.perf_counter()
+    try:
+        with animate.animation(frames, writer):
+            execute_script(script, params)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    if writer.count == 0:
+        raise click.ClickException(f"{script.name} does not support animation")
+    click.echo(
+        f"Wrote {writer.count} frames to {output} in {elapsed:.1f}s "
+        f"({writer.count / elapsed:.1f} fps)",
+        err=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Batch sampler used to generate the gallery images.
+
+A drop-in for ``gen-art sample``: the same per-sample seeds and output
+filenames, plus render memoization for scripts that declare their
+``effective_inputs``. Run from the repository root::
+
+    python -m artlib.batch scripts/pentomino.py -n 10 -o output
+
+With ``--design lhs`` (or ``sobol``) the batch's samples are placed together
+by ``artlib.design`` instead of drawn independently, so a few images cover
+the parameter space evenly. The design is fixed by the batch seed.
+
+With ``--workers N`` samples render in N processes. Source photos that
+scripts load through ``artlib.shared`` are downloaded and decoded once per
+batch and mapped read-only by every worker.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from pathlib import Path
+
+import click
+import numpy as np
+from gen_art_framework.executor import execute_script
+
+from artlib.design import DESIGNS, design_parameters, place
+from artlib.memo import RenderSession, RenderSkipped, RenderStore, render_session
+from artlib.metrics import peak_rss
+from artlib.runner import load_parameter_space, sample_parameters
+from artlib.shared import SharedImages, attach
+
+# Samples tried per requested image before duplicates are accepted.
+RESAMPLE_FACTOR = 20
+
+
+def _default_store() -> Path:
+    return Path(os.environ.get("ARTLIB_CACHE_DIR", Path.home() / ".cache" / "artlib")) / "renders"
+
+
+def _start_worker(images: SharedImages, tile_workers: int) -> None:
+    """Initialise a batch worker process."""
+    attach(images)
+    # Split the CPUs between the batch workers' own tile pools
+    os.environ["ARTLIB_TILE_WORKERS"] = str(tile_workers)
+
+
+def render_sample(
+    script: Path,
+    params: dict,
+    store: RenderStore | None,
+    namespace: str,
+    seen: set[str],
+    path: Path,
+) -> dict:
+    """Render one sample to ``path``, or report why it was skipped.
+
+    Runs in the batch process, or in a worker with ``--workers``.
+
+    Returns:
+        ``key`` and ``stored`` of a skipped render (``stored`` is None for a
+        duplicate), or ``key``, ``wall`` and ``cpu`` of a saved one.
+    """
+    session = RenderSession(store, namespace, seen)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        with render_session(session):
+            image = execute_script(script, params)
+    except RenderSkipped as skip:
+        return {"key": skip.key, "stored": skip.stored, "skipped": True}
+    image.save(path, format="PNG")
+    return {
+        "key": session.key,
+        "wall": round(time.perf_counter() - wall, 4),
+        "cpu": round(time.process_time() - cpu, 4),
+        "skipped": False,
+    }
+
+
+def run_batch(
+    script: Path,
+    count: int,
+    output: Path,
+    seed: int,
+    store: RenderStore | None = None,
+    allow_duplicates: bool = False,
+    renders: list[dict] | None = None,
+    design: str = "random",
+    workers: int = 1,
+) -> list[Path]:
+    """Render ``count`` images of ``script`` into ``output``.
+
+    Renders whose effective inputs are already in ``store`` are copied instead
+    of rendered. Unless ``allow_duplicates`` is set, samples that would repeat
+    an image already in the batch are skipped and a new sample is drawn, up to
+    ``RESAMPLE_FACTOR`` samples per image.
+
+    With several ``workers``, samples render in forked processes, and source
+    images loaded with ``artlib.shared.shared_image`` are shared between them.
+    Each worker's supersampling tile pool gets an equal share of the CPUs.
+    Results are taken in sample order, so the batch saves the same images as
+    with one worker.
+
+    Args:
+        design: ``"random"`` for independent samples, or a design method of
+            ``artlib.design.design_parameters``. Samples drawn to replace
+            duplicates are independent.
+        renders: If given, receives wall time, CPU time and output bytes of
+            every saved image (reused ones are marked ``reused``).
+        workers: Processes rendering samples at once.
+
+    Returns:
+        Paths of the saved images.
+    """
+    space = load_parameter_space(script)
+    source_hash = hashlib.sha256(script.read_bytes()).hexdigest()[:16]
+    namespace = f"{script.stem}:{source_hash}"
+
+    rng = np.random.default_rng(seed)
+    points = [] if design == "random" else design_parameters(space, count, seed, design)
+    seen: set[str] = set()
+    saved: list[Path] = []
+    attempts = 0
+    # Samples in flight, oldest first: (seed, duplicates allowed, part file, job)
+    pending: deque = deque()
+
+    manager = pool = images = None
+    if workers > 1:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        # Workers forked after this share the tracker, which then sees the
+        # shared segments they create unlinked here at the end
+        resource_tracker.ensure_running()
+        manager = context.Manager()
+        images = SharedImages(manager.dict(), manager.Condition())
+        tile_workers = max(1, (os.cpu_count() or 1) // workers)
+        pool = ProcessPoolExecutor(
+            workers, mp_context=context, initializer=_start_worker, initargs=(images, tile_workers)
+        )
+    try:
+        while len(saved) < count:
+            while len(pending) < workers:
+                # Same per-sample seeds as gen-art sample
+                sample_seed = int(rng.integers(0, 2**31))
+                attempts += 1
+                if not allow_duplicates and attempts > count * RESAMPLE_FACTOR:
+                    click.echo("  Effective output space exhausted; allowing duplicates", err=True)
+                    allow_duplicates = True
+
+                params = sample_parameters(space, sample_seed)
+                if attempts <= len(points):
+                    params = place(params, points[attempts - 1])
+                part = output / f".{script.stem}_{attempts}_{sample_seed}.png.part"
+                args = (script, params, store, namespace, set() if allow_duplicates else set(seen), part)
+                job = pool.submit(render_sample, *args) if pool else args
+                pending.append((sample_seed, allow_duplicates, part, job))
+
+            sample_seed, duplicates, part, job = pending.popleft()
+            click.echo(f"Generating image {len(saved) + 1}/{count}...", err=True)
+            result = job.result() if pool else render_sample(*job)
+            # A sample rendered alongside an earlier one can still repeat it
+            repeated = not duplicates and result["key"] in seen
+            if repeated or (result["skipped"] and result["stored"] is None):
+                part.unlink(missing_ok=True)
+                click.echo("  Duplicate of an image in this batch, resampling", err=True)
+                continue
+
+            image_path = output / f"{script.stem}_{len(saved)}_{sample_seed}.png"
+            if result["skipped"]:
+                shutil.copyfile(result["stored"], image_path)
+                seen.add(result["key"])
+                saved.append(image_path)
+                if renders is not None:
+                    renders.append({"reused": True, "bytes": image_path.stat().st_size})
+                click.echo(f"  Reused: {image_path}", err=True)
+                continue
+
+            part.replace(image_path)
+            if renders is not None:
+                renders.append({
+                    "wall": result["wall"],
+                    "cpu": result["cpu"],
+                    "bytes": image_path.stat().st_size,
+                })
+            if result["key"] is not None:
+                seen.add(result["key"])
+                if store is not None:
+                    store.put(result["key"], image_path)
+            saved.append(image_path)
+            click.echo(f"  Saved: {image_path}", err=True)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+            images.unlink()
+            manager.shutdown()
+        for _, _, part, _ in pending:
+            part.unlink(missing_ok=True)
+
+    return saved
+
+
+@click.command()
+@click.argument("script", type=click.Path(exists=True, path_type=Path))
+@click.option("--count", "-n", default=1, type=click.IntRange(min=1), help="Number of images to generate.")
+@click.option("--output", "-o", default=".", type=click.Path(path_type=Path), help="Output directory for generated images.")
+@click.option("--seed", "-s", default=None, type=int, help="Random seed for reproducibility.")
+@click.option(
+    "--store",
+    "store_dir",
+    default=None,
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Content-addressed render store (default: $ARTLIB_CACHE_DIR/renders).",
+)
+@click.option("--no-store", is_flag=True, help="Do not reuse or record renders.")
+@click.option("--allow-duplicates", is_flag=True, help="Keep samples that repeat an image in the batch.")
+@click.option(
+    "--metrics",
+    "metrics_path",
+    default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write per-render timings, output sizes and peak RSS to this JSON file.",
+)
+@click.option(
+    "--design",
+    default="random",
+    type=click.Choice(DESIGNS),
+    help="Independent random samples, or a Latin hypercube or Sobol design over the batch.",
+)
+@click.option(
+    "--workers",
+    "-j",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Processes rendering samples at once.",
+)
+def main(
+    script: Path,
+    count: int,
+    output: Path,
+    seed: int | None,
+    store_dir: Path | None,
+    no_store: bool,
+    allow_duplicates: bool,
+    metrics_path: Path | None,
+    design: str,
+    workers: int,
+):
+    """Generate images by sampling the parameter space of SCRIPT."""
+    output.mkdir(parents=True, exist_ok=True)
+    if seed is None:
+        seed = int(np.random.default_rng().integers(0, 2**31))
+        click.echo(f"Using random seed: {seed}", err=True)
+
+    store = None if no_store else RenderStore(store_dir or _default_store())
+    renders: list[dict] = []
+    try:
+        saved = run_batch(script, count, output, seed, store, allow_duplicates, renders, design, workers)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+    if metrics_path is not None:
+        metrics_path.parent.mkdir(parents=True, exist_ok=True)
+        metrics_path.write_text(json.dumps({
+            "script": script.stem,
+            "renders": renders,
+            "peak_rss": peak_rss(),
+        }))
+    click.echo(f"Generated {len(saved)} image(s) in {output}", err=True)
+
+
+if __name__ == "__main__":
+    main()
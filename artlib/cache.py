@@ -0,0 +1,182 @@
+"""Memoization of expensive intermediate stages, keyed by the inputs they consume.
+
+A stage such as a graph layout or a triangulation usually depends on a handful
+of parameters. Wrapping it with ``memoize`` and naming exactly those inputs lets
+parameter sweeps that only vary styling reuse the heavy computation::
+
+    tri = memoize(
+        "triangular_mosaic.delaunay",
+        {"seed": seed, "num_points": num_points, "width": width, "height": height},
+        lambda: Delaunay(points),
+    )
+
+Results are kept in a bounded in-memory LRU and in a size-bounded on-disk store
+(``ARTLIB_CACHE_DIR``, default ``~/.cache/artlib``; set it to an empty string
+to disable the disk store). Cached values are shared, so treat them as
+read-only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+DEFAULT_MEMORY_ENTRIES = 64
+DEFAULT_DISK_BYTES = 1 << 30
+
+
+def _encode(value: Any) -> Any:
+    # NumPy values stand in for their JSON equivalents; arrays are hashed
+    # whole, as their repr elides the middle of large arrays
+    if isinstance(value, np.ndarray):
+        digest = hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return {"ndarray": digest, "dtype": value.dtype.str, "shape": list(value.shape)}
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot key a stage on a {type(value).__name__}")
+
+
+def stage_key(stage: str, inputs: dict[str, Any]) -> str:
+    """Hash a stage name and its inputs into a cache key.
+
+    Raises:
+        TypeError: If an input is neither JSON nor a NumPy array or scalar.
+    """
+    payload = json.dumps([stage, inputs], sort_keys=True, default=_encode)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class StageCache:
+    """Two-level cache: an in-memory LRU in front of an on-disk pickle store.
+
+    Args:
+        directory: Disk store location, or None for memory only.
+        memory_entries: Maximum number of values kept in memory.
+        disk_bytes: Maximum total size of the disk store. The least recently
+            used files are removed once it is exceeded.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str | None,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        disk_bytes: int = DEFAULT_DISK_BYTES,
+    ):
+        self.directory = Path(directory) if directory else None
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self._memory: OrderedDict[str, Any] = OrderedDict()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pkl"
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Look up ``key``, returning ``(found, value)``."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return True, self._memory[key]
+        if self.directory is None:
+            return False, None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False, None
+        # Access time drives disk eviction
+        os.utime(path)
+        self._remember(key, value)
+        return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store ``value`` in memory and, if enabled, on disk."""
+        self._remember(key, value)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, path)
+        self._evict_disk()
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        files = []
+        for path in self.directory.glob("*/*.pkl"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        """Drop every cached value from memory and disk."""
+        self._memory.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*/*.pkl"):
+                path.unlink(missing_ok=True)
+
+
+def _default_directory() -> str:
+    return os.environ.get(
+        "ARTLIB_CACHE_DIR", str(Path.home() / ".cache" / "artlib")
+    )
+
+
+default_cache = StageCache(
+    _default_directory(),
+    disk_bytes=int(os.environ.get("ARTLIB_CACHE_BYTES", DEFAULT_DISK_BYTES)),
+)
+
+
+def memoize(
+    stage: str,
+    inputs: dict[str, Any],
+    compute: Callable[[], T],
+    cache: StageCache | None = None,
+) -> T:
+    """Return the cached result of ``compute`` for these inputs, computing it once.
+
+    Args:
+        stage: Name of the stage, unique across scripts (e.g. ``"network_art.graph"``).
+            Change it when the stage's code changes meaning.
+        inputs: Every value the stage's result depends on, as JSON values or
+            NumPy arrays and scalars. Anything left out is assumed not to
+            affect the result.
+        compute: Zero-argument function producing the result.
+        cache: Cache to use. Defaults to the process-wide ``default_cache``.
+
+    Returns:
+        The (possibly cached) result. Exceptions from ``compute`` propagate and
+        nothing is cached.
+    """
+    cache = cache or default_cache
+    key = stage_key(stage, inputs)
+    found, value = cache.get(key)
+    if found:
+        return value
+    value = compute()
+    cache.put(key, value)
+    return value
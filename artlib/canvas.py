@@ -0,0 +1,343 @@
+"""Drawing surfaces with tiled supersampling and an out-of-core backend."""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw
+
+from artlib.outofcore import MemmapImage, encode
+
+# Extra margin (in output pixels) added around every recorded primitive so
+# stroke joints and rasterisation rounding never fall outside its tile bins.
+_BBOX_MARGIN = 2
+
+# Longest side of the preview returned by out-of-core canvases.
+PREVIEW_SIZE = 2000
+
+# Output file for canvases created inside an ``output_target`` block.
+_output_target: Path | None = None
+
+
+def default_workers() -> int:
+    """Tile worker processes used when a render is not given ``workers``.
+
+    ``ARTLIB_TILE_WORKERS`` if set, otherwise the CPU count. Callers that
+    already render in several processes (``artlib.batch --workers``) set it
+    to their share of the CPUs, so nested tile pools do not oversubscribe.
+    """
+    return int(os.environ.get("ARTLIB_TILE_WORKERS") or os.cpu_count() or 1)
+
+
+@contextmanager
+def output_target(path: Path | str):
+    """Render canvases created inside the block out of core into ``path``.
+
+    Lets a runner switch an unmodified script to the memory-mapped backend,
+    e.g. for print renders far larger than fit in RAM.
+    """
+    global _output_target
+    previous = _output_target
+    _output_target = Path(path)
+    try:
+        yield
+    finally:
+        _output_target = previous
+
+
+def _flatten(xy) -> list[float]:
+    """Flatten ``[(x, y), ...]`` or ``[x, y, ...]`` into a flat list of floats."""
+    flat = []
+    for item in xy:
+        if isinstance(item, (tuple, list)):
+            flat.extend(float(v) for v in item)
+        else:
+            flat.append(float(item))
+    return flat
+
+
+class RecordingDraw:
+    """Stand-in for ``ImageDraw.Draw`` that records primitives for replay.
+
+    Only the primitives used by the gallery scripts are supported. Each call is
+    stored with its bounding box so it can later be replayed onto any region of
+    the canvas at any scale.
+    """
+
+    def __init__(self):
+        self.ops: list[tuple] = []
+
+    def _record(self, method: str, xy, pad: float, **kwargs: Any) -> None:
+        coords = _flatten(xy)
+        xs = coords[0::2]
+        ys = coords[1::2]
+        pad += _BBOX_MARGIN
+        bbox = (min(xs) - pad, min(ys) - pad, max(xs) + pad, max(ys) + pad)
+        self.ops.append((bbox, method, coords, kwargs))
+
+    def line(self, xy, fill=None, width=0, joint=None):
+        self._record("line", xy, max(width, 1), fill=fill, width=width, joint=joint)
+
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        self._record("ellipse", xy, width, fill=fill, outline=outline, width=width)
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        self._record("polygon", xy, width, fill=fill, outline=outline, width=width)
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        self._record("rectangle", xy, width, fill=fill, outline=outline, width=width)
+
+
+def replay(draw: ImageDraw.ImageDraw, ops, origin: tuple[float, float] = (0, 0),
+           factor: int = 1) -> None:
+    """Replay recorded primitives onto ``draw``.
+
+    Args:
+        draw: Target draw handle.
+        ops: Primitives recorded by a ``RecordingDraw``.
+        origin: Canvas coordinate that maps to the target's top-left corner.
+        factor: Scale applied to coordinates and stroke widths.
+    """
+    ox, oy = origin
+    for _, method, coords, kwargs in ops:
+        xy = [
+            (v - (ox if i % 2 == 0 else oy)) * factor for i, v in enumerate(coords)
+        ]
+        if factor != 1 and kwargs.get("width"):
+            kwargs = dict(kwargs, width=max(kwargs["width"], 1) * factor)
+        elif factor != 1 and method == "line":
+            kwargs = dict(kwargs, width=factor)
+        getattr(draw, method)(xy, **kwargs)
+
+
+def _tile_ops(ops, size: tuple[int, int], tile_size: int) -> dict[tuple, list]:
+    """Bin primitives by the output tiles their bounding boxes touch."""
+    width, height = size
+    cols = (width + tile_size - 1) // tile_size
+    rows = (height + tile_size - 1) // tile_size
+    bins: dict[tuple, list] = {}
+    for op in ops:
+        x0, y0, x1, y1 = op[0]
+        c0 = max(0, int(x0 // tile_size))
+        c1 = min(cols - 1, int(x1 // tile_size))
+        r0 = max(0, int(y0 // tile_size))
+        r1 = min(rows - 1, int(y1 // tile_size))
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                bins.setdefault((c, r), []).append(op)
+    return bins
+
+
+def _render_tile(mode: str, color, box: tuple[int, int, int, int], factor: int,
+                 ops) -> Image.Image:
+    """Render one tile at ``factor``x resolution and box-filter it down."""
+    x0, y0, x1, y1 = box
+    tile = Image.new(mode, ((x1 - x0) * factor, (y1 - y0) * factor), color)
+    replay(ImageDraw.Draw(tile), ops, origin=(x0, y0), factor=factor)
+    return tile.reduce(factor)
+
+
+def _tile_tasks(bins, size: tuple[int, int], tile_size: int, row: int | None = None):
+    """List ``(box, ops)`` pairs for binned tiles, optionally for one tile row."""
+    width, height = size
+    tasks = []
+    for (c, r), tile_ops in bins.items():
+        if row is not None and r != row:
+            continue
+        box = (
+            c * tile_size,
+            r * tile_size,
+            min(width, (c + 1) * tile_size),
+            min(height, (r + 1) * tile_size),
+        )
+        tasks.append((box, tile_ops))
+    return tasks
+
+
+def _iter_tiles(tasks, mode: str, color, factor: int, executor=None):
+    """Yield ``(box, tile)`` for each task, rendered serially or in ``executor``."""
+    if executor is None:
+        for box, tile_ops in tasks:
+            yield box, _render_tile(mode, color, box, factor, tile_ops)
+        return
+    futures = [
+        (box, executor.submit(_render_tile, mode, color, box, factor, tile_ops))
+        for box, tile_ops in tasks
+    ]
+    for box, future in futures:
+        yield box, future.result()
+
+
+def render_supersampled(
+    ops,
+    size: tuple[int, int],
+    mode: str,
+    color,
+    factor: int,
+    tile_size: int = 256,
+    workers: int | None = None,
+) -> Image.Image:
+    """Render recorded primitives with tiled supersampling anti-aliasing.
+
+    Each output tile is drawn at ``factor`` times the resolution using only the
+    primitives that touch it, then reduced into the output image. Peak memory is
+    one supersampled tile per worker plus the output image.
+
+    Args:
+        ops: Primitives recorded by a ``RecordingDraw``.
+        size: Output image size.
+        mode: Pillow image mode.
+        color: Background colour.
+        factor: Supersampling factor per axis.
+        tile_size: Output tile edge length in pixels.
+        workers: Number of worker processes. Defaults to ``default_workers()``.
+
+    Returns:
+        The anti-aliased image.
+    """
+    image = Image.new(mode, size, color)
+    tasks = _tile_tasks(_tile_ops(ops, size, tile_size), size, tile_size)
+
+    workers = workers or default_workers()
+    if workers == 1 or len(tasks) <= 1:
+        for box, tile in _iter_tiles(tasks, mode, color, factor):
+            image.paste(tile, box[:2])
+        return image
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for box, tile in _iter_tiles(tasks, mode, color, factor, executor):
+            image.paste(tile, box[:2])
+    return image
+
+
+def render_banded(
+    ops,
+    raw: MemmapImage,
+    color,
+    factor: int = 1,
+    tile_size: int = 256,
+    workers: int | None = None,
+) -> None:
+    """Render recorded primitives into a memory-mapped image one band at a time.
+
+    Each band is one row of tiles. Its tiles are rendered (supersampled when
+    ``factor`` is above 1), assembled in a band buffer and written to the raw
+    file, so resident memory is bounded by a band plus one tile per worker.
+
+    Args:
+        ops: Primitives recorded by a ``RecordingDraw``.
+        raw: Destination image.
+        color: Background colour.
+        factor: Supersampling factor per axis.
+        tile_size: Tile edge length and band height in pixels.
+        workers: Number of worker processes. Defaults to ``default_workers()``.
+    """
+    width, height = raw.size
+    fill = ImageColor.getcolor(color, raw.mode) if isinstance(color, str) else color
+    bins = _tile_ops(ops, raw.size, tile_size)
+    workers = workers or default_workers()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for row, y0 in enumerate(range(0, height, tile_size)):
+            band = np.empty((min(tile_size, height - y0), width, raw.bands), dtype=np.uint8)
+            band[:] = fill
+            tasks = _tile_tasks(bins, raw.size, tile_size, row=row)
+            for (x0, _, x1, y1), tile in _iter_tiles(tasks, raw.mode, color, factor, executor):
+                band[: y1 - y0, x0:x1] = np.asarray(tile).reshape(y1 - y0, x1 - x0, raw.bands)
+            raw.write_rows(y0, band)
+            for task in tasks:
+                del bins[(task[0][0] // tile_size, row)]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+class Canvas:
+    """Image and draw handle, optionally rendered with supersampling.
+
+    With ``supersample`` of 1 this is a plain Pillow image and ``ImageDraw``.
+    Above 1, ``draw`` records primitives and ``render`` replays them tile by
+    tile at the supersampled resolution.
+
+    Given an ``output`` path (or inside an ``output_target`` block) the canvas
+    is rendered out of core instead: primitives are replayed band by band into
+    a memory-mapped raw file next to the output, which is then streamed to a
+    PNG or TIFF. ``render`` returns a downscaled preview in that case, since
+    the full image never exists in memory.
+
+    Args:
+        size: Output image size.
+        mode: Pillow image mode.
+        color: Background colour.
+        supersample: Supersampling factor per axis.
+        tile_size: Output tile edge length used when supersampling.
+        workers: Worker processes used when supersampling.
+        output: File to stream an out-of-core render into.
+    """
+
+    def __init__(
+        self,
+        size: tuple[int, int],
+        mode: str = "RGB",
+        color=0,
+        supersample: int = 1,
+        tile_size: int = 256,
+        workers: int | None = None,
+        output: Path | str | None = None,
+    ):
+        self.size = size
+        self.mode = mode
+        self.color = color
+        self.supersample = max(1, int(supersample))
+        self.tile_size = tile_size
+        self.workers = workers
+        self.output = Path(output) if output else _output_target
+        if self.supersample > 1 or self.output is not None:
+            self._image = None
+            self.draw = RecordingDraw()
+        else:
+            self._image = Image.new(mode, size, color)
+            self.draw = ImageDraw.Draw(self._image)
+
+    def render(self, mode: str | None = None) -> Image.Image:
+        """Return the finished image.
+
+        Args:
+            mode: Convert the result to this mode. Out-of-core renders only
+                support dropping the alpha channel (``"RGBA"`` to ``"RGB"``).
+        """
+        if self.output is not None:
+            return self._render_out_of_core(mode)
+        image = self._image
+        if image is None:
+            image = render_supersampled(
+                self.draw.ops,
+                self.size,
+                self.mode,
+                self.color,
+                self.supersample,
+                tile_size=self.tile_size,
+                workers=self.workers,
+            )
+        return image.convert(mode) if mode and mode != image.mode else image
+
+    def _render_out_of_core(self, mode: str | None) -> Image.Image:
+        raw = MemmapImage(self.output.with_name(self.output.name + ".raw"), self.size, self.mode)
+        try:
+            render_banded(
+                self.draw.ops,
+                raw,
+                self.color,
+                self.supersample,
+                tile_size=self.tile_size,
+                workers=self.workers,
+            )
+            encode(raw, self.output, mode)
+            return raw.preview(PREVIEW_SIZE, mode)
+        finally:
+            raw.path.unlink(missing_ok=True)
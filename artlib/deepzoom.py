@@ -0,0 +1,126 @@
+"""Deep Zoom (DZI) tile pyramids for large gallery images."""
+
+from __future__ import annotations
+
+import math
+import shutil
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+TILE_SIZE = 254
+OVERLAP = 1
+
+DZI_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" TileSize="{tile_size}" Overlap="{overlap}" Format="{format}">
+  <Size Width="{width}" Height="{height}"/>
+</Image>
+"""
+
+
+def _save_tile(level_image: Image.Image, level_dir: Path, col: int, row: int,
+               tile_size: int, overlap: int, fmt: str) -> None:
+    width, height = level_image.size
+    x0 = max(0, col * tile_size - overlap)
+    y0 = max(0, row * tile_size - overlap)
+    x1 = min(width, (col + 1) * tile_size + overlap)
+    y1 = min(height, (row + 1) * tile_size + overlap)
+    tile = level_image.crop((x0, y0, x1, y1))
+    if fmt == "jpg":
+        tile.save(level_dir / f"{col}_{row}.jpg", quality=90)
+    else:
+        tile.save(level_dir / f"{col}_{row}.png")
+
+
+def generate_pyramid(
+    image_path: Path | str,
+    tile_size: int = TILE_SIZE,
+    overlap: int = OVERLAP,
+    workers: int | None = None,
+) -> dict:
+    """Write a DZI descriptor and tile pyramid next to an image.
+
+    Produces ``<stem>.dzi`` and ``<stem>_files/<level>/<col>_<row>.<fmt>``.
+    Each level halves the previous one, and the tiles of a level are encoded in
+    a thread pool (Pillow releases the GIL while encoding).
+
+    Args:
+        image_path: Source image.
+        tile_size: Tile edge length, excluding overlap.
+        overlap: Pixels shared with each neighbouring tile.
+        workers: Encoder threads. Defaults to the executor's default.
+
+    Returns:
+        Pyramid metadata for the gallery index (descriptor path is relative to
+        the image's directory).
+    """
+    image_path = Path(image_path)
+    image = Image.open(image_path)
+    image.load()
+    fmt = "png" if "A" in image.getbands() else "jpg"
+    if fmt == "jpg" and image.mode != "RGB":
+        image = image.convert("RGB")
+    width, height = image.size
+    max_level = math.ceil(math.log2(max(width, height)))
+
+    files_dir = image_path.with_name(f"{image_path.stem}_files")
+    shutil.rmtree(files_dir, ignore_errors=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        level_image = image
+        for level in range(max_level, -1, -1):
+            scale = 2 ** (max_level - level)
+            size = (max(1, math.ceil(width / scale)), max(1, math.ceil(height / scale)))
+            if level_image.size != size:
+                level_image = level_image.resize(size, Image.LANCZOS)
+            level_dir = files_dir / str(level)
+            level_dir.mkdir(parents=True)
+            for row in range(math.ceil(size[1] / tile_size)):
+                for col in range(math.ceil(size[0] / tile_size)):
+                    futures.append(executor.submit(
+                        _save_tile, level_image, level_dir, col, row, tile_size, overlap, fmt
+                    ))
+        for future in futures:
+            future.result()
+
+    image_path.with_suffix(".dzi").write_text(DZI_TEMPLATE.format(
+        tile_size=tile_size, overlap=overlap, format=fmt, width=width, height=height
+    ))
+    return {
+        "path": f"{image_path.stem}.dzi",
+        "width": width,
+        "height": height,
+        "tile_size": tile_size,
+        "overlap": overlap,
+        "format": fmt,
+    }
+
+
+def read_descriptor(dzi_path: Path | str) -> dict | None:
+    """Pyramid metadata of an existing DZI descriptor, as ``generate_pyramid`` returns it.
+
+    Returns:
+        The metadata, or None if the descriptor or its tiles are missing or
+        the descriptor cannot be parsed.
+    """
+    dzi_path = Path(dzi_path)
+    if not dzi_path.with_name(f"{dzi_path.stem}_files").is_dir():
+        return None
+    try:
+        root = ElementTree.parse(dzi_path).getroot()
+    except (OSError, ElementTree.ParseError):
+        return None
+    size = next((child for child in root if child.tag.endswith("Size")), None)
+    if size is None:
+        return None
+    return {
+        "path": dzi_path.name,
+        "width": int(size.get("Width")),
+        "height": int(size.get("Height")),
+        "tile_size": int(root.get("TileSize")),
+        "overlap": int(root.get("Overlap")),
+        "format": root.get("Format"),
+    }
@@ -0,0 +1,250 @@
+"""Random graph generators in NumPy and SciPy, returning edge arrays.
+
+These stand in for the networkx generators ``network_art`` uses. They scale
+to poster-sized graphs of 10k-100k nodes, where per-edge Python loops and
+dict-of-dicts graphs take longer than the rest of the render::
+
+    rng = np.random.default_rng(seed)
+    edges = barabasi_albert(100_000, 3, rng)   # (num_edges, 2) int array
+
+Edges are ``(u, v)`` rows with ``u < v`` over nodes ``0 .. n - 1``, without
+duplicates, sorted. The same generator state gives the same graph. The graphs
+follow the same models as networkx but not its random sequence, so a seed
+gives a different graph than the networkx generator of the same name.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Rounds of redrawing rewired or attached edges that collide with an existing
+# edge before giving up on them (attached ones are then dropped).
+MAX_REDRAWS = 1000
+
+# Targets drawn at once for an attached edge that must be redrawn; the first
+# that is not already a neighbour is kept.
+CANDIDATES = 8
+
+
+def _canonical(edges: np.ndarray, n: int) -> np.ndarray:
+    """Order each edge ``u < v``, sort the rows and drop repeats."""
+    keys = np.sort(np.minimum(edges[:, 0], edges[:, 1]) * n + np.maximum(edges[:, 0], edges[:, 1]))
+    keys = keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+    return np.column_stack([keys // n, keys % n])
+
+
+def _repeated(keys: np.ndarray) -> np.ndarray:
+    """Mask of entries whose key already occurred earlier in ``keys``."""
+    order = np.argsort(keys, kind="stable")
+    ordered = keys[order]
+    repeated = np.zeros(len(keys), dtype=bool)
+    repeated[order[1:][ordered[1:] == ordered[:-1]]] = True
+    return repeated
+
+
+def random_geometric(n: int, radius: float, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Nodes uniform in the unit square, joined when at most ``radius`` apart.
+
+    A k-d tree radius query finds the pairs, so the cost grows with the
+    number of edges rather than with every pair of nodes.
+
+    Returns:
+        ``(positions, edges)``, with positions an ``(n, 2)`` array.
+    """
+    positions = rng.random((n, 2))
+    edges = cKDTree(positions).query_pairs(radius, output_type="ndarray")
+    return positions, _canonical(edges.reshape(-1, 2).astype(np.int64), n)
+
+
+def erdos_renyi(n: int, p: float, rng: np.random.Generator) -> np.ndarray:
+    """Every pair of nodes joined independently with probability ``p``.
+
+    Rather than a coin per pair, the gaps between successive chosen pairs are
+    drawn from a geometric distribution (Batagelj and Brandes, 2005), so the
+    cost grows with the number of edges. Pair indices are then unranked into
+    ``(u, v)`` in closed form.
+    """
+    pairs = n * (n - 1) // 2
+    if p <= 0 or pairs == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    if p >= 1:
+        chosen = np.arange(pairs, dtype=np.int64)
+    else:
+        blocks = []
+        last = -1
+        while last < pairs:
+            expected = (pairs - last) * p
+            gaps = rng.geometric(p, size=int(expected + 5 * np.sqrt(expected)) + 16)
+            block = last + np.cumsum(gaps)
+            blocks.append(block)
+            last = block[-1]
+        chosen = np.concatenate(blocks)
+        chosen = chosen[chosen < pairs]
+
+    # Pair k is (u, v) with v(v - 1)/2 <= k < v(v + 1)/2 and u = k - v(v - 1)/2
+    v = ((1 + np.sqrt(1 + 8 * chosen.astype(np.float64))) // 2).astype(np.int64)
+    v -= v * (v - 1) // 2 > chosen
+    v += v * (v + 1) // 2 <= chosen
+    u = chosen - v * (v - 1) // 2
+    return _canonical(np.column_stack([u, v]), n)
+
+
+def watts_strogatz(n: int, k: int, p: float, rng: np.random.Generator) -> np.ndarray:
+    """Ring lattice of ``k`` nearest neighbours with each edge rewired with probability ``p``.
+
+    All rewired edges get a new random end at once. Ends that would make a
+    self-loop or repeat an edge are redrawn together until none collide.
+    """
+    if k >= n:
+        raise ValueError(f"k ({k}) must be smaller than n ({n})")
+    u = np.tile(np.arange(n), k // 2)
+    v = (u + np.repeat(np.arange(1, k // 2 + 1), n)) % n
+    lattice = v.copy()
+    redraw = np.flatnonzero(rng.random(len(u)) < p)
+    for _ in range(MAX_REDRAWS):
+        if not len(redraw):
+            break
+        v[redraw] = rng.integers(0, n, size=len(redraw))
+        keys = np.minimum(u, v) * n + np.maximum(u, v)
+        # Unchanged lattice edges win a collision, so they come first
+        rewired = np.zeros(len(u), dtype=bool)
+        rewired[redraw] = True
+        order = np.argsort(rewired, kind="stable")
+        collides = np.zeros(len(u), dtype=bool)
+        collides[order] = _repeated(keys[order])
+        collides |= u == v
+        redraw = redraw[collides[redraw]]
+    # Edges still colliding keep their place in the lattice
+    v[redraw] = lattice[redraw]
+    return _canonical(np.column_stack([u, v]), n)
+
+
+def _attach(n: int, m: int, p: float, rng: np.random.Generator) -> np.ndarray:
+    """Preferential attachment of nodes ``m + 1 .. n - 1`` to a star of ``m + 1`` nodes.
+
+    Every edge fills two slots of one array, its source and its target, so
+    a node appears in the array once per unit of degree. A target slot
+    points at a uniform slot from before its node's own edges, which picks
+    an earlier node in proportion to its degree. The slot pointed at may be
+    another target that is not known yet. Pointer jumping resolves every such
+    chain at once.
+
+    With probability ``p`` each edge of a node after its first closes a
+    triangle instead (Holme and Kim). It points at the far end of a random
+    earlier edge of the node's latest attached target, so its target is a
+    random neighbour of that target.
+
+    Targets that repeat one of the node's edges are drawn again, so each new
+    node gets ``m`` distinct neighbours, as in the networkx models. A closing
+    edge that keeps repeating one falls back to attachment. Redrawing changes
+    a slot's pointer, so slots that copy it pick up the new node when they
+    are resolved again. Slots are settled in blocks that double in size, so
+    these rounds only revisit the block being settled.
+
+    Returns:
+        The node in every slot, as an ``(edges, 2)`` array.
+    """
+    edges = m + (n - m - 1) * m
+    nodes = np.empty(2 * edges, dtype=np.int64)
+    nodes[0::2] = np.concatenate([np.zeros(m, dtype=np.int64), np.repeat(np.arange(m + 1, n), m)])
+    nodes[1:2 * m:2] = np.arange(1, m + 1)
+
+    attached = np.arange(2 * m + 1, 2 * edges, 2)
+    index = np.arange(len(attached))
+    # First slot of the source's own edges; everything before it is earlier
+    limit = 2 * (m + (nodes[attached - 1] - m - 1) * m)
+    drawn = (rng.random(len(attached)) * limit).astype(np.int64)
+    closing = (index % m > 0) & (rng.random(len(attached)) < p)
+    fraction = rng.random(len(attached))
+    tries = np.zeros(len(attached), dtype=np.int64)
+    pointer = np.arange(2 * edges)
+    pointer[attached] = drawn
+
+    # Slots before lo are settled: their nodes are final and they point at themselves
+    lo = 2 * m
+    while lo < 2 * edges:
+        # Every node has 2m slots, so doubling keeps blocks on node boundaries
+        # and each node's edges settle together
+        hi = min(2 * edges, 2 * lo)
+        block = slice((lo - 2 * m) // 2, (hi - 2 * m) // 2)
+        slots = attached[block]
+        for _ in range(MAX_REDRAWS):
+            previous = nodes[slots].copy()
+            resolved = pointer[lo:hi]
+            while True:
+                jumped = pointer[resolved]
+                if np.array_equal(jumped, resolved):
+                    break
+                resolved = jumped
+            nodes[lo:hi] = nodes[resolved]
+
+            within = closing[block]
+            if within.any():
+                # Closing edges anchor on the node's latest attached target. A
+                # node's first edge always attaches, so the running maximum
+                # never reaches back into an earlier node.
+                latest = np.maximum.accumulate(np.where(within, -1, index[block]))
+                anchor = nodes[attached[latest[within]]]
+                # Earlier slots of each anchor, found in slots sorted by node
+                ranked = np.sort(nodes[:hi] * hi + np.arange(hi))
+                order = ranked % hi
+                offsets = np.searchsorted(ranked, np.arange(n) * hi)
+                counts = np.searchsorted(ranked, anchor * hi + limit[block][within]) - offsets[anchor]
+                picked = order[offsets[anchor] + (fraction[block][within] * counts).astype(np.int64)]
+                pointer[slots[within]] = picked ^ 1
+                nodes[slots[within]] = nodes[picked ^ 1]
+
+            repeated = _repeated(nodes[slots - 1] * n + nodes[slots])
+            if not repeated.any() and np.array_equal(nodes[slots], previous):
+                break
+            # A closing edge that repeats one tries other neighbours, then attaches
+            retry = repeated & within
+            tries[block][retry] += 1
+            fraction[block][retry] = rng.random(retry.sum())
+            fallback = retry & (tries[block] > m)
+            closing[block] &= ~fallback
+            pointer[slots[fallback]] = drawn[block][fallback]
+
+            # Attached repeats are redrawn until their nodes have none, checking
+            # only those nodes; the next resolution passes the changes on
+            redraw = slots[repeated & ~retry]
+            for _ in range(MAX_REDRAWS):
+                if not len(redraw):
+                    break
+                i = (redraw - 2 * m - 1) // 2
+                sources = nodes[redraw - 1]
+                distinct = np.sort(sources)
+                distinct = distinct[np.concatenate([[True], distinct[1:] != distinct[:-1]])]
+                own = attached[(((distinct - m - 1) * m)[:, None] + np.arange(m)).ravel()]
+                taken = np.sort(nodes[own - 1] * n + nodes[own])
+                candidates = (rng.random((len(i), CANDIDATES)) * limit[i][:, None]).astype(np.int64)
+                keys = sources[:, None] * n + nodes[candidates]
+                found = taken[np.minimum(np.searchsorted(taken, keys), len(taken) - 1)]
+                fresh = found != keys
+                # Rows with no fresh candidate keep their last one and repeat
+                keep = np.where(fresh.any(axis=1), fresh.argmax(axis=1), CANDIDATES - 1)
+                drawn[i] = candidates[np.arange(len(i)), keep]
+                pointer[redraw] = drawn[i]
+                nodes[redraw] = nodes[drawn[i]]
+                redraw = own[_repeated(nodes[own - 1] * n + nodes[own])]
+        pointer[lo:hi] = np.arange(lo, hi)
+        lo = hi
+    return nodes.reshape(-1, 2)
+
+
+def barabasi_albert(n: int, m: int, rng: np.random.Generator) -> np.ndarray:
+    """Barabási-Albert graph: each new node attaches to ``m`` nodes by degree."""
+    if not 1 <= m < n:
+        raise ValueError(f"m ({m}) must be at least 1 and smaller than n ({n})")
+    return _canonical(_attach(n, m, 0.0, rng), n)
+
+
+def powerlaw_cluster(n: int, m: int, p: float, rng: np.random.Generator) -> np.ndarray:
+    """Holme-Kim graph: preferential attachment where each edge after a node's
+    first closes a triangle with probability ``p``."""
+    if not 1 <= m < n:
+        raise ValueError(f"m ({m}) must be at least 1 and smaller than n ({n})")
+    if not 0 <= p <= 1:
+        raise ValueError(f"p ({p}) must be in [0, 1]")
+    return _canonical(_attach(n, m, p, rng), n)
@@ -0,0 +1,123 @@
+"""Render memoization keyed by the inputs a render actually consumes.
+
+Some scripts have a tiny effective output space: pentomino's image depends only
+on the chosen shape, colour and background, whatever the seed. A script
+declares those inputs as soon as it knows them::
+
+    effective_inputs(shape=shape_name, colour=colour, background=background)
+
+Outside a render session (e.g. under plain ``gen-art sample``) this does
+nothing. Inside one (``python -m artlib.batch``) it canonicalises the inputs
+into a key and stops the render early when that image was already produced in
+the batch (the runner resamples) or is in the content-addressed store (the
+runner reuses the stored file).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+
+class RenderSkipped(BaseException):
+    """Raised inside a script to abandon a render whose output is already known.
+
+    Derives from ``BaseException`` so ``except Exception`` blocks in scripts
+    (e.g. around downloads) cannot swallow it.
+
+    Args:
+        key: Effective-input key of the render.
+        stored: Path of the stored output, or None if it is a duplicate within
+            the current batch.
+    """
+
+    def __init__(self, key: str, stored: Path | None = None):
+        super().__init__(key)
+        self.key = key
+        self.stored = stored
+
+
+class RenderStore:
+    """Content-addressed store of rendered images, keyed by effective inputs.
+
+    Args:
+        directory: Store location.
+    """
+
+    def __init__(self, directory: Path | str):
+        self.directory = Path(directory)
+
+    def path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.png"
+
+    def get(self, key: str) -> Path | None:
+        """Return the stored image for ``key``, if any."""
+        path = self.path(key)
+        return path if path.exists() else None
+
+    def put(self, key: str, image_path: Path) -> None:
+        """Copy a rendered image into the store under ``key``."""
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        shutil.copyfile(image_path, tmp)
+        tmp.replace(path)
+
+
+class RenderSession:
+    """Per-render state shared between the batch runner and ``effective_inputs``.
+
+    Args:
+        store: Store to look renders up in, or None.
+        namespace: Identifies the script (and its source) that keys belong to.
+        seen: Keys already rendered in this batch.
+    """
+
+    def __init__(self, store: RenderStore | None, namespace: str, seen: set[str]):
+        self.store = store
+        self.namespace = namespace
+        self.seen = seen
+        self.key: str | None = None
+
+
+_session: RenderSession | None = None
+
+
+@contextmanager
+def render_session(session: RenderSession):
+    """Make ``session`` receive the ``effective_inputs`` of the script run inside."""
+    global _session
+    previous = _session
+    _session = session
+    try:
+        yield session
+    finally:
+        _session = previous
+
+
+def render_key(namespace: str, inputs: dict[str, Any]) -> str:
+    """Canonicalise effective inputs into a content key."""
+    payload = json.dumps([namespace, inputs], sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def effective_inputs(**inputs: Any) -> None:
+    """Declare every input the rest of the render depends on.
+
+    Raises:
+        RenderSkipped: Inside a render session, when the same inputs were
+            already rendered in the batch or are in the store.
+    """
+    if _session is None:
+        return
+    key = render_key(_session.namespace, inputs)
+    if key in _session.seen:
+        raise RenderSkipped(key)
+    stored = _session.store.get(key) if _session.store else None
+    if stored is not None:
+        raise RenderSkipped(key, stored)
+    _session.key = key
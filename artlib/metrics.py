@@ -0,0 +1,136 @@
+"""Render metrics and their history across gallery builds.
+
+The batch runner measures every render (wall time, CPU time, output bytes)
+and the peak RSS of the whole run, and writes them to a small JSON file per
+script. Publishing folds those into ``history.json``, which ships with the
+gallery and gains one row per rendered script per build. The file is
+columnar, one array per field with script names stored once, so it stays
+compact over hundreds of builds::
+
+    {"scripts": ["circles", ...],
+     "columns": {"time": [...], "build": [...], "script": [0, ...],
+                 "renders": [...], "wall": [...], "cpu": [...],
+                 "peak_rss": [...], "bytes": [...]}}
+
+``regressions`` compares each script's latest median render time with the
+median over its trailing window of builds.
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import sys
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+COLUMNS = ("time", "build", "script", "renders", "wall", "cpu", "peak_rss", "bytes")
+
+# Builds kept in the history; older rows are dropped.
+MAX_BUILDS = 200
+
+# Builds before the latest that a script's render time is compared with.
+DEFAULT_WINDOW = 5
+
+# Ratio of latest to trailing median render time that counts as a regression.
+DEFAULT_THRESHOLD = 1.5
+
+
+def peak_rss() -> int | None:
+    """Peak resident set size of this process or a finished child so far, in bytes."""
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # macOS reports bytes, Linux and the BSDs kilobytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def summarize(renders: list[dict]) -> dict:
+    """Medians of the renders that were actually drawn (not reused)."""
+    drawn = [render for render in renders if not render.get("reused")]
+    if not drawn:
+        return {"renders": 0, "wall": None, "cpu": None, "bytes": None}
+    return {
+        "renders": len(drawn),
+        "wall": round(statistics.median(r["wall"] for r in drawn), 3),
+        "cpu": round(statistics.median(r["cpu"] for r in drawn), 3),
+        "bytes": int(statistics.median(r["bytes"] for r in drawn)),
+    }
+
+
+def load_history(path: Path) -> dict:
+    """Read a history file, or start an empty one."""
+    if path.exists():
+        history = json.loads(path.read_text())
+        for column in COLUMNS:
+            history["columns"].setdefault(column, [None] * len(history["columns"]["time"]))
+        return history
+    return {"scripts": [], "columns": {column: [] for column in COLUMNS}}
+
+
+def append_build(history: dict, time: int, build: str, metrics: list[dict]) -> None:
+    """Add one row per script run in this build, dropping the oldest builds.
+
+    Args:
+        metrics: Per-script metrics as written by the batch runner.
+    """
+    scripts = history["scripts"]
+    columns = history["columns"]
+    for entry in metrics:
+        summary = summarize(entry["renders"])
+        if summary["renders"] == 0:
+            continue
+        if entry["script"] not in scripts:
+            scripts.append(entry["script"])
+        row = dict(
+            summary,
+            time=time,
+            build=build,
+            script=scripts.index(entry["script"]),
+            peak_rss=entry.get("peak_rss"),
+        )
+        for column in COLUMNS:
+            columns[column].append(row[column])
+
+    builds = list(dict.fromkeys(columns["build"]))
+    if len(builds) > MAX_BUILDS:
+        keep = set(builds[-MAX_BUILDS:])
+        rows = [i for i, build in enumerate(columns["build"]) if build in keep]
+        for column in COLUMNS:
+            columns[column] = [columns[column][i] for i in rows]
+
+
+def regressions(
+    history: dict,
+    build: str,
+    window: int = DEFAULT_WINDOW,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[tuple[str, float, float]]:
+    """Scripts whose median render time in ``build`` regressed.
+
+    A script regresses when its median wall time in ``build`` exceeds
+    ``threshold`` times the median of its previous ``window`` builds.
+
+    Returns:
+        ``(script, latest, trailing)`` for each regressed script.
+    """
+    columns = history["columns"]
+    found = []
+    for index, script in enumerate(history["scripts"]):
+        rows = [i for i, s in enumerate(columns["script"]) if s == index]
+        latest = [i for i in rows if columns["build"][i] == build]
+        earlier = [columns["wall"][i] for i in rows if columns["build"][i] != build][-window:]
+        if not latest or not earlier:
+            continue
+        current = columns["wall"][latest[-1]]
+        trailing = statistics.median(earlier)
+        if trailing > 0 and current > threshold * trailing:
+            found.append((script, current, trailing))
+    return found
@@ -0,0 +1,221 @@
+"""Memory-mapped raw images and streaming PNG/TIFF encoders."""
+
+from __future__ import annotations
+
+import math
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+BANDS = {"L": 1, "RGB": 3, "RGBA": 4}
+
+# Rows mapped at once when streaming a raw image out.
+_CHUNK_ROWS = 256
+
+
+class MemmapImage:
+    """Raw interleaved 8-bit image stored in a file on disk.
+
+    Only the rows being read or written are mapped at any time, so resident
+    memory stays bounded by the chunk size regardless of the image size.
+
+    Args:
+        path: Location of the raw pixel file.
+        size: Image size as ``(width, height)``.
+        mode: One of ``"L"``, ``"RGB"`` or ``"RGBA"``.
+    """
+
+    def __init__(self, path: Path | str, size: tuple[int, int], mode: str):
+        if mode not in BANDS:
+            raise ValueError(f"Unsupported mode for raw image: {mode}")
+        self.path = Path(path)
+        self.size = size
+        self.mode = mode
+        self.bands = BANDS[mode]
+        width, height = size
+        with open(self.path, "wb") as f:
+            f.truncate(width * height * self.bands)
+
+    @property
+    def row_bytes(self) -> int:
+        return self.size[0] * self.bands
+
+    def rows(self, y0: int, y1: int, writable: bool = False) -> np.memmap:
+        """Map rows ``y0`` to ``y1`` as a ``(rows, width, bands)`` array."""
+        return np.memmap(
+            self.path,
+            dtype=np.uint8,
+            mode="r+" if writable else "r",
+            offset=y0 * self.row_bytes,
+            shape=(y1 - y0, self.size[0], self.bands),
+        )
+
+    def write_rows(self, y0: int, band: np.ndarray) -> None:
+        """Write a ``(rows, width, bands)`` array starting at row ``y0``."""
+        view = self.rows(y0, y0 + band.shape[0], writable=True)
+        view[:] = band
+        view.flush()
+        del view
+
+    def iter_rows(self, chunk_rows: int = _CHUNK_ROWS, bands: int | None = None):
+        """Yield consecutive ``(rows, width, bands)`` chunks from top to bottom.
+
+        Args:
+            chunk_rows: Rows mapped per chunk.
+            bands: Keep only the first ``bands`` channels (e.g. 3 to drop alpha).
+        """
+        height = self.size[1]
+        for y0 in range(0, height, chunk_rows):
+            view = self.rows(y0, min(height, y0 + chunk_rows))
+            chunk = np.array(view[:, :, :bands] if bands else view)
+            del view
+            yield chunk
+
+    def preview(self, max_size: int, mode: str | None = None) -> Image.Image:
+        """Build a downscaled copy by reducing the image chunk by chunk."""
+        mode = mode or self.mode
+        width, height = self.size
+        factor = max(1, math.ceil(max(width, height) / max_size))
+        preview = Image.new(mode, (math.ceil(width / factor), math.ceil(height / factor)))
+        chunk_rows = factor * max(1, _CHUNK_ROWS // factor)
+        y = 0
+        for chunk in self.iter_rows(chunk_rows, bands=BANDS[mode]):
+            part = Image.fromarray(chunk.squeeze(axis=2) if mode == "L" else chunk, mode)
+            preview.paste(part.reduce(factor), (0, y))
+            y += math.ceil(chunk.shape[0] / factor)
+        return preview
+
+
+def _png_chunk(f, tag: bytes, data: bytes) -> None:
+    f.write(struct.pack(">I", len(data)))
+    f.write(tag)
+    f.write(data)
+    f.write(struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+
+def write_png(raw: MemmapImage, path: Path | str, mode: str | None = None,
+              level: int = 6) -> None:
+    """Encode a raw image as PNG one chunk of rows at a time.
+
+    Args:
+        raw: Source image.
+        path: Output file.
+        mode: Output mode; may drop alpha from an RGBA source.
+        level: zlib compression level.
+    """
+    mode = mode or raw.mode
+    color_type = {"L": 0, "RGB": 2, "RGBA": 6}[mode]
+    width, height = raw.size
+    compressor = zlib.compressobj(level)
+    pending = bytearray()
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        _png_chunk(f, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+        for chunk in raw.iter_rows(bands=BANDS[mode]):
+            rows = chunk.reshape(chunk.shape[0], -1)
+            # Filter type 0 (None) byte in front of every scanline
+            filtered = np.zeros((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+            filtered[:, 1:] = rows
+            pending += compressor.compress(filtered.tobytes())
+            if len(pending) >= 1 << 20:
+                _png_chunk(f, b"IDAT", bytes(pending))
+                pending.clear()
+        pending += compressor.flush()
+        _png_chunk(f, b"IDAT", bytes(pending))
+        _png_chunk(f, b"IEND", b"")
+
+
+# TIFF field types
+_SHORT = 3
+_LONG = 4
+_LONG8 = 16
+_TYPE_FORMATS = {_SHORT: "H", _LONG: "I", _LONG8: "Q"}
+
+
+def write_tiff(raw: MemmapImage, path: Path | str, mode: str | None = None) -> None:
+    """Encode a raw image as an uncompressed strip TIFF, streaming the pixels.
+
+    BigTIFF is used automatically when the pixel data would overflow the
+    32-bit offsets of a classic TIFF.
+
+    Args:
+        raw: Source image.
+        path: Output file.
+        mode: Output mode; may drop alpha from an RGBA source.
+    """
+    mode = mode or raw.mode
+    bands = BANDS[mode]
+    width, height = raw.size
+    row_bytes = width * bands
+    data_size = row_bytes * height
+    big = data_size + (1 << 24) >= 1 << 32
+    header_size = 16 if big else 8
+    offset_type = _LONG8 if big else _LONG
+
+    rows_per_strip = max(1, (1 << 20) // row_bytes)
+    num_strips = math.ceil(height / rows_per_strip)
+    strip_offsets = [header_size + i * rows_per_strip * row_bytes for i in range(num_strips)]
+    strip_counts = [
+        min(rows_per_strip, height - i * rows_per_strip) * row_bytes for i in range(num_strips)
+    ]
+
+    entries = [
+        (256, _LONG, [width]),
+        (257, _LONG, [height]),
+        (258, _SHORT, [8] * bands),
+        (259, _SHORT, [1]),
+        (262, _SHORT, [1 if bands == 1 else 2]),
+        (273, offset_type, strip_offsets),
+        (277, _SHORT, [bands]),
+        (278, _LONG, [rows_per_strip]),
+        (279, offset_type, strip_counts),
+        (284, _SHORT, [1]),
+    ]
+    if mode == "RGBA":
+        # Unassociated alpha
+        entries.append((338, _SHORT, [2]))
+
+    ifd_offset = header_size + data_size + (data_size % 2)
+    entry_size, count_format, inline_size = (20, "<Q", 8) if big else (12, "<H", 4)
+    ifd_size = struct.calcsize(count_format) + entry_size * len(entries) + inline_size
+    extra_offset = ifd_offset + ifd_size
+
+    ifd = bytearray(struct.pack(count_format, len(entries)))
+    extra = bytearray()
+    for tag, field_type, values in entries:
+        payload = struct.pack(f"<{len(values)}{_TYPE_FORMATS[field_type]}", *values)
+        if len(payload) <= inline_size:
+            value = payload.ljust(inline_size, b"\x00")
+        else:
+            value = struct.pack("<Q" if big else "<I", extra_offset + len(extra))
+            extra += payload
+            if len(extra) % 2:
+                extra += b"\x00"
+        ifd += struct.pack("<HHQ" if big else "<HHI", tag, field_type, len(values)) + value
+    ifd += b"\x00" * inline_size
+
+    with open(path, "wb") as f:
+        if big:
+            f.write(b"II" + struct.pack("<HHHQ", 43, 8, 0, ifd_offset))
+        else:
+            f.write(b"II" + struct.pack("<HI", 42, ifd_offset))
+        for chunk in raw.iter_rows(bands=bands):
+            f.write(chunk.tobytes())
+        if data_size % 2:
+            f.write(b"\x00")
+        f.write(ifd)
+        f.write(extra)
+
+
+def encode(raw: MemmapImage, path: Path | str, mode: str | None = None) -> None:
+    """Stream a raw image to PNG or TIFF, chosen by the file suffix."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".png":
+        write_png(raw, path, mode)
+    elif suffix in (".tif", ".tiff"):
+        write_tiff(raw, path, mode)
+    else:
+        raise ValueError(f"Unsupported output format for streaming encoder: {suffix}")
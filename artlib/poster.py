@@ -0,0 +1,64 @@
+"""Render a script at print resolution with the out-of-core canvas.
+
+Example::
+
+    python -m artlib.poster scripts/abstract_crowd.py -o crowd.tiff \\
+        --set width=30000 --set height=20000
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import click
+from gen_art_framework.executor import execute_script
+
+from artlib.canvas import output_target
+from artlib.runner import load_parameter_space, parse_overrides, sample_parameters
+
+
+@click.command()
+@click.argument("script", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--output",
+    "-o",
+    required=True,
+    type=click.Path(path_type=Path),
+    help="Output .png or .tiff file.",
+)
+@click.option("--seed", "-s", default=0, type=int, help="Sample seed.")
+@click.option(
+    "--set",
+    "assignments",
+    multiple=True,
+    metavar="NAME=VALUE",
+    help="Override a parameter (value parsed as YAML). Repeatable.",
+)
+def main(script: Path, output: Path, seed: int, assignments: tuple[str, ...]):
+    """Render SCRIPT out of core into OUTPUT, streaming the encoded image.
+
+    The script's canvas is backed by a memory-mapped raw file next to OUTPUT
+    and drawn band by band, so resident memory stays bounded regardless of the
+    output size. A downscaled preview is saved alongside.
+    """
+    try:
+        params = sample_parameters(
+            load_parameter_space(script), seed, parse_overrides(assignments)
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output_target(output):
+        try:
+            preview = execute_script(script, params)
+        except ValueError as e:
+            raise click.ClickException(str(e)) from e
+
+    preview_path = output.with_name(f"{output.stem}.preview.png")
+    preview.save(preview_path)
+    click.echo(f"Saved {output} (preview: {preview_path})", err=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""Build the gallery index and derived assets for publishing.
+
+Run from the repository root after the images have been generated::
+
+    python -m artlib.publish gallery
+
+Images are renamed after their content (``<stem>.<hash>.png``), so a
+published name always refers to the same bytes. The gallery's service worker
+(``sw.js``) can then cache them forever, and a regenerated image is fetched
+fresh because its name changes.
+
+Each script's grid thumbnails are also packed into one atlas image, with
+each thumbnail's place in it recorded in the index. The grid draws thumbnails
+as CSS sprites of the atlas, so a page load costs one request per script, and
+full images are fetched only when one is opened.
+
+Deep-zoom pyramids are kept in ``$ARTLIB_CACHE_DIR/pyramids``, which the
+workflow restores between builds. An image's name carries its content hash,
+so a stored pyramid of the same name is copied instead of being built again,
+and only newly rendered images pay for tiling.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+
+import click
+from PIL import Image
+
+from artlib.deepzoom import OVERLAP, TILE_SIZE, generate_pyramid, read_descriptor
+from artlib.metrics import append_build, load_history, regressions
+
+# Images whose longest side exceeds this get a deep-zoom tile pyramid.
+DZI_MIN_SIZE = 2048
+
+# Hex digits of the content hash embedded in published image names.
+HASH_LENGTH = 12
+
+# Width in pixels of the placeholder previews embedded in gallery.json.
+PLACEHOLDER_WIDTH = 16
+
+# Width in pixels of the grid thumbnails packed into each script's atlas
+# (grid cells are about 320 CSS pixels wide, so this covers 2x screens).
+THUMB_WIDTH = 640
+
+# Thumbnails per row of an atlas.
+ATLAS_COLUMNS = 5
+
+# Pixels between thumbnails, so scaled sprites never bleed into a neighbour.
+ATLAS_PADDING = 2
+
+ATLAS_QUALITY = 82
+
+_HASH_SUFFIX = re.compile(rf"\.[0-9a-f]{{{HASH_LENGTH}}}$")
+
+
+def content_hashed(path: Path) -> Path:
+    """Rename an image to ``<stem>.<hash><suffix>`` after its content.
+
+    Names that already carry the right hash are left alone, so publishing a
+    gallery downloaded from a previous deploy renames nothing.
+
+    Returns:
+        The image's new path.
+    """
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()[:HASH_LENGTH]
+    stem = _HASH_SUFFIX.sub("", path.stem)
+    hashed = path.with_name(f"{stem}.{digest}{path.suffix}")
+    if hashed != path:
+        path.replace(hashed)
+    return hashed
+
+
+def placeholder(path: Path) -> tuple[int, int, str]:
+    """Intrinsic size and a tiny preview of an image, as a PNG data URI.
+
+    The preview is ``PLACEHOLDER_WIDTH`` pixels wide (a few hundred bytes),
+    small enough to inline in the index so the gallery can paint it before
+    the image loads.
+
+    Returns:
+        ``(width, height, data_uri)``.
+    """
+    with Image.open(path) as image:
+        width, height = image.size
+        preview_height = max(1, round(height * PLACEHOLDER_WIDTH / width))
+        # reducing_gap shrinks with a cheap box filter before resampling
+        preview = image.resize(
+            (PLACEHOLDER_WIDTH, preview_height), Image.BILINEAR, reducing_gap=2.0
+        ).convert("RGB")
+    buffer = io.BytesIO()
+    preview.save(buffer, "PNG", optimize=True)
+    return width, height, "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def _hashed_preview(path: Path) -> tuple[Path, int, int, str]:
+    """Content-hash an image, then size and preview it (see ``placeholder``)."""
+    hashed = content_hashed(path)
+    return (hashed, *placeholder(hashed))
+
+
+def _default_pyramid_store() -> Path | None:
+    cache = os.environ.get("ARTLIB_CACHE_DIR", str(Path.home() / ".cache" / "artlib"))
+    return Path(cache) / "pyramids" if cache else None
+
+
+def _reusable(dzi_path: Path) -> dict | None:
+    """Metadata of an existing pyramid, if it was built with the current tiling."""
+    dzi = read_descriptor(dzi_path)
+    if dzi is None or (dzi["tile_size"], dzi["overlap"]) != (TILE_SIZE, OVERLAP):
+        return None
+    return dzi
+
+
+def pyramid(img: Path, store: Path | None) -> dict:
+    """Deep-zoom pyramid of a content-hashed image, built only if none exists yet.
+
+    A pyramid already next to the image is kept. Otherwise one stored under
+    the same name in ``store`` is copied over, or a new one is generated and
+    added to ``store``.
+
+    Returns:
+        Pyramid metadata, as from ``generate_pyramid``.
+    """
+    dzi = _reusable(img.with_suffix(".dzi"))
+    if dzi is not None:
+        return dzi
+    files = f"{img.stem}_files"
+    stored = store / img.parent.name / img.with_suffix(".dzi").name if store else None
+    dzi = _reusable(stored) if stored else None
+    if dzi is not None:
+        shutil.rmtree(img.with_name(files), ignore_errors=True)
+        shutil.copytree(stored.with_name(files), img.with_name(files))
+        shutil.copyfile(stored, img.with_suffix(".dzi"))
+        return dzi
+
+    dzi = generate_pyramid(img)
+    if stored:
+        # Copied under a temporary name, so an interrupted copy is never reused
+        stored.parent.mkdir(parents=True, exist_ok=True)
+        partial = stored.with_name(files + ".tmp")
+        shutil.rmtree(partial, ignore_errors=True)
+        shutil.copytree(img.with_name(files), partial)
+        shutil.rmtree(stored.with_name(files), ignore_errors=True)
+        partial.replace(stored.with_name(files))
+        shutil.copyfile(img.with_suffix(".dzi"), stored)
+    return dzi
+
+
+def prune_pyramids(store: Path, gallery: list[dict]) -> None:
+    """Delete stored pyramids of images that are no longer in the gallery."""
+    kept = {
+        image["dzi"]["path"] for entry in gallery for image in entry["images"] if "dzi" in image
+    }
+    for dzi_path in store.glob("*/*.dzi"):
+        if f"images/{dzi_path.parent.name}/{dzi_path.name}" not in kept:
+            shutil.rmtree(dzi_path.with_name(f"{dzi_path.stem}_files"), ignore_errors=True)
+            dzi_path.unlink()
+
+
+def build_entry(
+    gallery_dir: Path,
+    script_name: str,
+    store: Path | None = None,
+    executor: Executor | None = None,
+) -> dict | None:
+    """Index one script's images, generating deep-zoom pyramids for large ones.
+
+    Images are renamed after their content first, so pyramids (named after
+    the image) are content-addressed too, and are reused from ``store`` when
+    an earlier build made them. Each image is indexed with its intrinsic size
+    and an inline placeholder preview, made right after it is hashed, on
+    ``executor`` if one is given.
+
+    Returns:
+        The gallery entry, or None if the script has no images.
+    """
+    img_dir = gallery_dir / "images" / script_name
+    if not img_dir.exists():
+        return None
+
+    # Hashing, decoding and downscaling release the GIL, so images are
+    # indexed in parallel on a thread pool
+    indexed = (executor.map if executor else map)(_hashed_preview, sorted(img_dir.glob("*.png")))
+
+    images = []
+    for img, width, height, preview in indexed:
+        image = {
+            "filename": img.name,
+            "path": f"images/{script_name}/{img.name}",
+            "width": width,
+            "height": height,
+            "placeholder": preview,
+        }
+        if max(width, height) > DZI_MIN_SIZE:
+            dzi = pyramid(img, store)
+            dzi["path"] = f"images/{script_name}/{dzi['path']}"
+            image["dzi"] = dzi
+        images.append(image)
+
+    if not images:
+        return None
+    return {"script": script_name, "images": images}
+
+
+def build_atlas(gallery_dir: Path, entry: dict) -> None:
+    """Pack an entry's thumbnails into one WebP atlas and record where each is.
+
+    Thumbnails are at most ``THUMB_WIDTH`` wide, in rows of ``ATLAS_COLUMNS``. The
+    entry gains ``atlas`` (path and size) and each image a ``sprite`` box
+    within it. The atlas is content-hashed like the images, and atlases of
+    earlier builds are removed.
+    """
+    img_dir = gallery_dir / "images" / entry["script"]
+    thumbs = []
+    for image in entry["images"]:
+        with Image.open(gallery_dir / image["path"]) as full:
+            width = min(THUMB_WIDTH, full.width)
+            height = max(1, round(full.height * width / full.width))
+            thumbs.append(
+                full.convert("RGB").resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+            )
+
+    stride = max(thumb.width for thumb in thumbs) + ATLAS_PADDING
+    rows = [thumbs[i:i + ATLAS_COLUMNS] for i in range(0, len(thumbs), ATLAS_COLUMNS)]
+    row_heights = [max(thumb.height for thumb in row) for row in rows]
+    atlas = Image.new(
+        "RGB",
+        (stride * min(len(thumbs), ATLAS_COLUMNS) - ATLAS_PADDING,
+         sum(row_heights) + ATLAS_PADDING * (len(rows) - 1)),
+    )
+    top = 0
+    for r, row in enumerate(rows):
+        for c, thumb in enumerate(row):
+            atlas.paste(thumb, (c * stride, top))
+            entry["images"][r * ATLAS_COLUMNS + c]["sprite"] = {
+                "x": c * stride,
+                "y": top,
+                "width": thumb.width,
+                "height": thumb.height,
+            }
+        top += row_heights[r] + ATLAS_PADDING
+
+    for stale in img_dir.glob("atlas.*.webp"):
+        stale.unlink()
+    path = img_dir / "atlas.webp"
+    atlas.save(path, "WEBP", quality=ATLAS_QUALITY, method=6)
+    path = content_hashed(path)
+    entry["atlas"] = {
+        "path": f"images/{entry['script']}/{path.name}",
+        "width": atlas.width,
+        "height": atlas.height,
+    }
+
+
+def build_index(gallery_dir: Path, scripts_dir: Path, store: Path | None = None) -> list[dict]:
+    """Rebuild ``gallery.json`` entries for every script in ``scripts_dir``.
+
+    Entries for scripts that no longer exist are kept, ahead of the rebuilt ones.
+    One thread pool serves the whole build: it indexes each script's images,
+    then packs the rebuilt entries' atlases in parallel.
+    """
+    index_path = gallery_dir / "gallery.json"
+    gallery = json.loads(index_path.read_text()) if index_path.exists() else []
+
+    script_names = [script.stem for script in sorted(scripts_dir.glob("*.py"))]
+    gallery = [entry for entry in gallery if entry["script"] not in script_names]
+    entries = []
+    with ThreadPoolExecutor() as executor:
+        for script_name in script_names:
+            click.echo(f"Indexing {script_name}...", err=True)
+            entry = build_entry(gallery_dir, script_name, store, executor)
+            if entry:
+                entries.append(entry)
+
+        click.echo(f"Packing {len(entries)} thumbnail atlases...", err=True)
+        # list() re-raises any error from a worker
+        list(executor.map(lambda entry: build_atlas(gallery_dir, entry), entries))
+    return gallery + entries
+
+
+def record_metrics(gallery_dir: Path, metrics_dir: Path, build: str) -> None:
+    """Append this build's render metrics to ``history.json`` and warn on regressions."""
+    metrics = [json.loads(path.read_text()) for path in sorted(metrics_dir.glob("*.json"))]
+    history_path = gallery_dir / "history.json"
+    history = load_history(history_path)
+    append_build(history, int(time.time()), build, metrics)
+    history_path.write_text(json.dumps(history, separators=(",", ":")))
+
+    for script, latest, trailing in regressions(history, build):
+        message = (
+            f"{script} median render time {latest:.2f}s is {latest / trailing:.1f}x "
+            f"its trailing median of {trailing:.2f}s"
+        )
+        # Shown as an annotation on the workflow run
+        prefix = "::warning::" if os.environ.get("GITHUB_ACTIONS") else "Warning: "
+        click.echo(prefix + message, err=True)
+
+
+@click.command()
+@click.argument(
+    "gallery_dir", type=click.Path(exists=True, file_okay=False, path_type=Path)
+)
+@click.option(
+    "--scripts",
+    "scripts_dir",
+    default="scripts",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Directory of art scripts.",
+)
+@click.option(
+    "--metrics",
+    "metrics_dir",
+    default=None,
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory of batch --metrics files to add to history.json.",
+)
+@click.option(
+    "--build",
+    default=lambda: os.environ.get("GITHUB_SHA", "local")[:12],
+    help="Build identifier recorded in history.json (default: $GITHUB_SHA).",
+)
+@click.option(
+    "--pyramid-store",
+    "store_dir",
+    default=None,
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Deep-zoom pyramids kept between builds (default: $ARTLIB_CACHE_DIR/pyramids).",
+)
+@click.option("--no-pyramid-store", is_flag=True, help="Build every pyramid from scratch.")
+def main(
+    gallery_dir: Path,
+    scripts_dir: Path,
+    metrics_dir: Path | None,
+    build: str,
+    store_dir: Path | None,
+    no_pyramid_store: bool,
+):
+    """Write GALLERY_DIR/gallery.json and its derived assets."""
+    store = None if no_pyramid_store else store_dir or _default_pyramid_store()
+    gallery = build_index(gallery_dir, scripts_dir, store)
+    if store is not None and store.exists():
+        prune_pyramids(store, gallery)
+    with open(gallery_dir / "gallery.json", "w") as f:
+        json.dump(gallery, f, indent=2)
+    if metrics_dir is not None and metrics_dir.exists():
+        record_metrics(gallery_dir, metrics_dir, build)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Parameter sampling and script execution shared by the artlib CLIs."""
+
+from __future__ import annotations
+
+import ast
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import yaml
+from gen_art_framework.distributions import sample_parameter_space
+from gen_art_framework.schema import ParameterSpace, parse_parameter_space
+
+
+def load_parameter_space(script: Path | str) -> ParameterSpace:
+    """Parse the parameter space from a script's docstring.
+
+    Raises:
+        ValueError: If the script has no docstring or the parameter space is invalid.
+    """
+    docstring = ast.get_docstring(ast.parse(Path(script).read_text()))
+    if docstring is None:
+        raise ValueError(f"Script '{script}' has no docstring with parameter space.")
+    return parse_parameter_space(docstring)
+
+
+def parse_overrides(assignments: tuple[str, ...] | list[str]) -> dict[str, Any]:
+    """Parse ``name=value`` assignments, reading each value as YAML."""
+    overrides = {}
+    for assignment in assignments:
+        name, sep, value = assignment.partition("=")
+        if not sep:
+            raise ValueError(f"Override must look like name=value, got '{assignment}'")
+        overrides[name.strip()] = yaml.safe_load(value)
+    return overrides
+
+
+def sample_parameters(
+    space: ParameterSpace, seed: int, overrides: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Sample one parameter set the same way ``gen-art sample`` does per image.
+
+    Args:
+        space: Parameter space of the script.
+        seed: Per-sample seed (the number in gen-art's output filenames).
+        overrides: Values that replace sampled parameters.
+
+    Raises:
+        ValueError: If an override names a parameter the script does not declare.
+    """
+    params = sample_parameter_space(space, np.random.default_rng(seed))
+    for name, value in (overrides or {}).items():
+        if name not in params:
+            raise ValueError(f"Unknown parameter '{name}'")
+        params[name] = value
+    return params
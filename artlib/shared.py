@@ -0,0 +1,151 @@
+"""Source images shared between the batch runner's worker processes.
+
+Scripts that start from downloaded photos fetch and decode the same sources in
+every sample. With ``artlib.batch --workers``, each worker process would do
+that separately and keep its own decoded copies. ``shared_image`` loads a
+source once per batch into ``multiprocessing.shared_memory``, and every worker
+maps that one copy::
+
+    source = shared_image("remix.source", {"url": url}, lambda: download(url))
+    img = source.convert("RGB")   # private copy to work on
+
+The returned image is read-only and maps the shared block directly, so an
+extra worker costs no memory for it until it copies the image. Pillow can only
+map 1, 3 or 4 byte pixels as ``L``, ``RGBX`` or ``RGBA``. RGB sources are
+therefore stored as ``RGBX`` and come back in that mode; convert to ``RGB``
+before applying effects.
+
+Outside a batch with workers, ``shared_image`` is ``memoize`` and returns the
+computed image itself.
+"""
+
+from __future__ import annotations
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable
+
+from PIL import Image
+
+from artlib.cache import memoize, stage_key
+
+# Modes Pillow can map onto a buffer without copying, and what other modes
+# are stored as.
+MAPPED_MODES = {"L": "L", "RGB": "RGBX", "RGBX": "RGBX", "RGBA": "RGBA"}
+
+
+class SharedImages:
+    """Index of images in shared memory, used by every process of a batch.
+
+    Args:
+        index: Shared dict from cache key to ``(segment name, size, mode)``,
+            or to None while one process computes the image, e.g. from a
+            ``multiprocessing.Manager``.
+        condition: Shared condition guarding ``index``. It is held only to
+            claim or publish a key, not while an image is computed, and
+            processes wanting a key that is being computed wait on it.
+    """
+
+    def __init__(self, index, condition):
+        self.index = index
+        self.condition = condition
+        # Segments this process created or mapped, kept open while in use
+        self._mapped: dict[str, tuple[SharedMemory, Image.Image]] = {}
+
+    def __getstate__(self):
+        return {"index": self.index, "condition": self.condition}
+
+    def __setstate__(self, state):
+        self.__init__(state["index"], state["condition"])
+
+    def get(self, key: str, compute: Callable[[], Image.Image]) -> Image.Image:
+        """The image under ``key``, computed and published by the first caller.
+
+        Raises:
+            Exception: Whatever ``compute`` raised. The key is released, so
+                the next caller computes it again.
+        """
+        if key in self._mapped:
+            return self._mapped[key][1]
+        with self.condition:
+            self.condition.wait_for(lambda: self.index.get(key, ()) is not None)
+            entry = self.index.get(key)
+            if entry is None:
+                # Claimed: other processes wait for this one to publish it
+                self.index[key] = None
+        if entry is None:
+            try:
+                image = compute()
+            except BaseException:
+                with self.condition:
+                    del self.index[key]
+                    self.condition.notify_all()
+                raise
+            entry = self._publish(key, image)
+        name, size, mode = entry
+        if key not in self._mapped:
+            segment = SharedMemory(name)
+            image = Image.frombuffer(mode, size, segment.buf, "raw", mode, 0, 1)
+            self._mapped[key] = (segment, image)
+        return self._mapped[key][1]
+
+    def _publish(self, key: str, image: Image.Image) -> tuple[str, tuple[int, int], str]:
+        mode = MAPPED_MODES.get(image.mode, "RGBA")
+        data = image.convert(mode).tobytes()
+        segment = SharedMemory(create=True, size=len(data))
+        segment.buf[:len(data)] = data
+        entry = (segment.name, image.size, mode)
+        self._mapped[key] = (segment, Image.frombuffer(mode, image.size, segment.buf, "raw", mode, 0, 1))
+        with self.condition:
+            self.index[key] = entry
+            self.condition.notify_all()
+        return entry
+
+    def close(self) -> None:
+        """Drop this process's mappings; images returned earlier become invalid."""
+        segments = [segment for segment, _ in self._mapped.values()]
+        self._mapped.clear()
+        for segment in segments:
+            segment.close()
+
+    def unlink(self) -> None:
+        """Free every published segment (once, after the batch's workers exit)."""
+        self.close()
+        for entry in self.index.values():
+            if entry is None:
+                continue
+            name, _, _ = entry
+            try:
+                segment = SharedMemory(name)
+            except FileNotFoundError:
+                continue
+            segment.close()
+            segment.unlink()
+        self.index.clear()
+
+
+_images: SharedImages | None = None
+
+
+def attach(images: SharedImages | None) -> None:
+    """Make ``shared_image`` use ``images`` in this process (worker initializer)."""
+    global _images
+    _images = images
+
+
+def shared_image(
+    stage: str, inputs: dict, compute: Callable[[], Image.Image]
+) -> Image.Image:
+    """Return the image ``compute`` produces for these inputs, loaded once per batch.
+
+    Args:
+        stage, inputs, compute: As for ``artlib.cache.memoize``, which caches
+            the image across batches.
+
+    Returns:
+        Inside a batch with workers, a read-only image mapping shared memory
+        (RGB comes back as ``RGBX``). Otherwise the memoized image itself.
+        Treat both as read-only.
+    """
+    if _images is None:
+        return memoize(stage, inputs, compute)
+    return _images.get(stage_key(stage, inputs), lambda: memoize(stage, inputs, compute))
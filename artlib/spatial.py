@@ -0,0 +1,193 @@
+"""Uniform-grid spatial index for constant-time proximity queries.
+
+Points are bucketed into square cells of ``cell_size``; a query only visits
+the cells its radius overlaps, so with ``radius <= cell_size`` every lookup
+touches at most nine buckets however many points are stored::
+
+    grid = UniformGrid(cell_size=separation)
+    if not grid.any_within(x, y, separation):
+        grid.insert(x, y, line_id)
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Iterator
+
+
+class UniformGrid:
+    """Buckets of ``(x, y, item)`` entries on a square grid.
+
+    Cells are created on first use, so the index costs nothing for empty space
+    and needs no bounds.
+
+    Args:
+        cell_size: Side of a grid cell. Queries are cheapest when their radius
+            is at most this.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = float(cell_size)
+        self._cells: dict[tuple[int, int], list[tuple[float, float, Any]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._cells.values())
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def insert(self, x: float, y: float, item: Any = None) -> None:
+        """Add a point, with an optional payload returned by queries."""
+        self._cells.setdefault(self._cell(x, y), []).append((x, y, item))
+
+    def _buckets(self, x: float, y: float, radius: float):
+        """Yield the non-empty buckets of the cells overlapping the query disc."""
+        size = self.cell_size
+        cells = self._cells
+        for gx in range(math.floor((x - radius) / size), math.floor((x + radius) / size) + 1):
+            for gy in range(math.floor((y - radius) / size), math.floor((y + radius) / size) + 1):
+                bucket = cells.get((gx, gy))
+                if bucket:
+                    yield bucket
+
+    def query(self, x: float, y: float, radius: float) -> Iterator[tuple[float, float, Any]]:
+        """Yield the entries within ``radius`` of ``(x, y)``."""
+        radius_sq = radius * radius
+        for bucket in self._buckets(x, y, radius):
+            for entry in bucket:
+                dx = entry[0] - x
+                dy = entry[1] - y
+                if dx * dx + dy * dy < radius_sq:
+                    yield entry
+
+    def any_within(
+        self,
+        x: float,
+        y: float,
+        radius: float,
+        ignore: Callable[[Any], bool] | None = None,
+    ) -> bool:
+        """Whether any entry lies within ``radius`` of ``(x, y)``.
+
+        Args:
+            ignore: Optional predicate on an entry's item; entries it accepts
+                do not count. Only called for entries inside the radius.
+        """
+        # Hot path of most callers, so the bucket walk is inlined
+        size = self.cell_size
+        cells = self._cells
+        radius_sq = radius * radius
+        for gx in range(math.floor((x - radius) / size), math.floor((x + radius) / size) + 1):
+            for gy in range(math.floor((y - radius) / size), math.floor((y + radius) / size) + 1):
+                bucket = cells.get((gx, gy))
+                if not bucket:
+                    continue
+                for px, py, item in bucket:
+                    dx = px - x
+                    dy = py - y
+                    if dx * dx + dy * dy < radius_sq and (ignore is None or not ignore(item)):
+                        return True
+        return False
+
+
+class DiscGrid:
+    """Overlap index for discs of very different sizes, on a square grid.
+
+    A ``UniformGrid`` query must reach as far as the largest stored disc,
+    which visits crowded cells once small discs fill the gaps between large
+    ones. Here each disc is instead entered in every cell its bounding box
+    covers. A query then reads only the cells under the candidate, so small
+    candidates cost the same however large the stored discs are.
+
+    Args:
+        cell_size: Side of a grid cell, best around the typical small radius.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = float(cell_size)
+        self._cells: dict[tuple[int, int], list[tuple[float, float, float]]] = {}
+
+    def _span(self, x: float, y: float, radius: float):
+        size = self.cell_size
+        return (
+            range(math.floor((x - radius) / size), math.floor((x + radius) / size) + 1),
+            range(math.floor((y - radius) / size), math.floor((y + radius) / size) + 1),
+        )
+
+    def insert(self, x: float, y: float, radius: float) -> None:
+        """Add the disc of ``radius`` around ``(x, y)``."""
+        entry = (x, y, radius)
+        cells = self._cells
+        columns, rows = self._span(x, y, radius)
+        for gx in columns:
+            for gy in rows:
+                cells.setdefault((gx, gy), []).append(entry)
+
+    def overlaps(self, x: float, y: float, radius: float, gap: float = 0.0) -> bool:
+        """Whether the disc would come within ``gap`` of a stored disc."""
+        cells = self._cells
+        columns, rows = self._span(x, y, radius + gap)
+        for gx in columns:
+            for gy in rows:
+                bucket = cells.get((gx, gy))
+                if not bucket:
+                    continue
+                for px, py, pr in bucket:
+                    reach = radius + pr + gap
+                    dx = px - x
+                    dy = py - y
+                    if dx * dx + dy * dy < reach * reach:
+                        return True
+        return False
+
+
+def poisson_disk(
+    bounds: tuple[float, float, float, float],
+    radius: Callable[[float, float], float],
+    max_radius: float,
+    rng,
+    candidates: int = 30,
+    cell_size: float | None = None,
+) -> list[tuple[float, float]]:
+    """Variable-radius Poisson-disk sample of a rectangle (Bridson's algorithm).
+
+    Starting from one random point, each step takes a random active point and
+    tries ``candidates`` points at one to two times its radius. The first one
+    with no point within its own radius is kept and becomes active. A point
+    whose candidates all fail is retired. A grid lookup checks each candidate
+    against nearby points only, so the cost grows linearly with the number of
+    points.
+
+    Args:
+        bounds: ``(x0, y0, x1, y1)`` of the sampled rectangle.
+        radius: Minimum spacing around a position, at most ``max_radius``.
+        rng: Source of ``random()`` values, e.g. the ``random`` module.
+        cell_size: Grid cell size (default ``max_radius``).
+
+    Returns:
+        The points, in the order they were placed.
+    """
+    x0, y0, x1, y1 = bounds
+    grid = UniformGrid(cell_size or max_radius)
+    points = [(x0 + (x1 - x0) * rng.random(), y0 + (y1 - y0) * rng.random())]
+    grid.insert(*points[0])
+    active = [0]
+    tau = 2 * math.pi
+    while active:
+        slot = int(rng.random() * len(active))
+        px, py = points[active[slot]]
+        r = radius(px, py)
+        for _ in range(candidates):
+            angle = tau * rng.random()
+            distance = r * (1 + rng.random())
+            x = px + distance * math.cos(angle)
+            y = py + distance * math.sin(angle)
+            if x0 <= x <= x1 and y0 <= y <= y1 and not grid.any_within(x, y, radius(x, y)):
+                grid.insert(x, y)
+                active.append(len(points))
+                points.append((x, y))
+                break
+        else:
+            active[slot] = active[-1]
+            active.pop()
+    return points
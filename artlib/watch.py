@@ -0,0 +1,406 @@
+"""Re-render scripts as they are edited, with results pushed to a browser page.
+
+Run from the repository root and open the printed URL::
+
+    python -m artlib.watch scripts --count 4
+
+The scripts directory is polled for changes. When a script is saved, the
+render of the previous version is cancelled and the changed script is
+rendered again: every sample at preview scale first, then at full size. Each
+image appears on the page as soon as it is done, sent over server-sent events.
+
+Renders run in a child process so they can be killed mid-render. On
+platforms with ``fork`` the child is forked from this process, which has
+already imported the modules the script uses, so a render starts without
+paying for numpy, scipy and friends again.
+"""
+
+from __future__ import annotations
+
+import ast
+import importlib
+import json
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from tempfile import mkdtemp
+from typing import Any
+
+import click
+import numpy as np
+
+from artlib.runner import load_parameter_space, parse_overrides, sample_parameters
+
+POLL_INTERVAL = 0.1
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>artlib watch</title>
+<style>
+body { background: #111; color: #ddd; font-family: sans-serif; margin: 1rem; }
+#status { color: #888; margin-bottom: 1rem; }
+#grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(320px, 1fr)); gap: 1rem; }
+figure { margin: 0; }
+img { width: 100%; display: block; image-rendering: auto; }
+figcaption { font-size: 0.8rem; color: #888; }
+pre { color: #ff6b6b; white-space: pre-wrap; }
+</style>
+</head>
+<body>
+<div id="status">Waiting for changes...</div>
+<pre id="error"></pre>
+<div id="grid"></div>
+<script>
+const status = document.getElementById('status');
+const error = document.getElementById('error');
+const grid = document.getElementById('grid');
+const events = new EventSource('events');
+events.addEventListener('start', e => {
+    const job = JSON.parse(e.data);
+    status.textContent = `Rendering ${job.script}...`;
+    error.textContent = '';
+    grid.replaceChildren(...Array.from({ length: job.count }, () => {
+        const figure = document.createElement('figure');
+        figure.append(document.createElement('img'), document.createElement('figcaption'));
+        return figure;
+    }));
+});
+events.addEventListener('render', e => {
+    const render = JSON.parse(e.data);
+    const figure = grid.children[render.index];
+    figure.querySelector('img').src = render.url;
+    figure.querySelector('figcaption').textContent =
+        `seed ${render.seed} - ${render.stage} in ${render.seconds.toFixed(2)}s`;
+    status.textContent = `${render.script}: ${render.stage} ${render.index + 1} done, `
+        + `${render.since_change.toFixed(2)}s after the change`;
+});
+events.addEventListener('failed', e => {
+    error.textContent = JSON.parse(e.data).message;
+});
+</script>
+</body>
+</html>
+"""
+
+
+def preload_imports(script: Path) -> None:
+    """Import the modules ``script`` imports, so forked renders start warm."""
+    try:
+        tree = ast.parse(script.read_text())
+    except SyntaxError:
+        return
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+
+
+def render_job(
+    script: Path,
+    samples: list[tuple[int, dict[str, Any]]],
+    output: Path,
+    prefix: str,
+    preview_scale: float,
+    connection,
+) -> None:
+    """Render every sample at preview scale, then at full size (child process).
+
+    Sends one message per finished image over ``connection``, or an error
+    message if the script raises.
+    """
+    from gen_art_framework.executor import execute_script
+
+    stages = [("preview", preview_scale), ("full", 1.0)] if preview_scale < 1 else [("full", 1.0)]
+    try:
+        for stage, scale in stages:
+            for index, (sample_seed, params) in enumerate(samples):
+                params = dict(params)
+                if scale < 1:
+                    for name in ("width", "height"):
+                        if isinstance(params.get(name), int):
+                            params[name] = max(1, round(params[name] * scale))
+                    if "supersample" in params:
+                        params["supersample"] = 1
+                start = time.perf_counter()
+                image = execute_script(script, params)
+                path = output / f"{prefix}_{index}_{stage}.png"
+                image.save(path, compress_level=1)
+                connection.send({
+                    "type": "render",
+                    "index": index,
+                    "seed": sample_seed,
+                    "stage": stage,
+                    "file": path.name,
+                    "seconds": time.perf_counter() - start,
+                })
+    except Exception:
+        connection.send({"type": "error", "message": traceback.format_exc()})
+    finally:
+        connection.close()
+
+
+class EventHub:
+    """Fans events out to every connected server-sent-events client."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: list[queue.Queue] = []
+
+    def subscribe(self) -> queue.Queue:
+        client: queue.Queue = queue.Queue()
+        with self._lock:
+            self._clients.append(client)
+        return client
+
+    def unsubscribe(self, client: queue.Queue) -> None:
+        with self._lock:
+            self._clients.remove(client)
+
+    def publish(self, event: str, data: dict) -> None:
+        with self._lock:
+            for client in self._clients:
+                client.put((event, data))
+
+
+class WatchHandler(SimpleHTTPRequestHandler):
+    """Serves the page, the rendered images and the event stream."""
+
+    def __init__(self, *args, hub: EventHub, **kwargs):
+        self.hub = hub
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path in ("/", "/index.html"):
+            body = PAGE.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == "/events":
+            self._stream_events()
+        else:
+            super().do_GET()
+
+    def _stream_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        client = self.hub.subscribe()
+        try:
+            while True:
+                try:
+                    event, data = client.get(timeout=15)
+                    message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+                except queue.Empty:
+                    # Comment line, so dead connections are noticed
+                    message = ": keep-alive\n\n"
+                self.wfile.write(message.encode())
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.hub.unsubscribe(client)
+
+
+class Watcher:
+    """Renders the latest version of a changed script, cancelling stale renders.
+
+    Args:
+        output: Directory the renders are written to (and served from).
+        hub: Where render events are published.
+        count: Samples rendered per change.
+        seed: Batch seed; samples use the same per-sample seeds as ``artlib.batch``.
+        overrides: Parameter overrides applied to every sample.
+        preview_scale: Size of the first, quick pass relative to full size.
+    """
+
+    def __init__(
+        self,
+        output: Path,
+        hub: EventHub,
+        count: int,
+        seed: int,
+        overrides: dict[str, Any],
+        preview_scale: float,
+    ):
+        self.output = output
+        self.hub = hub
+        self.count = count
+        self.seed = seed
+        self.overrides = overrides
+        self.preview_scale = preview_scale
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        self._process = None
+        self._generation = 0
+
+    def cancel(self) -> None:
+        """Kill the render in flight, if any."""
+        if self._process is not None and self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._process = None
+
+    def render(self, script: Path, changed_at: float) -> None:
+        """Start rendering ``script``, replacing any render in flight."""
+        self.cancel()
+        self._generation += 1
+        generation = self._generation
+        try:
+            space = load_parameter_space(script)
+            rng = np.random.default_rng(self.seed)
+            samples = []
+            for _ in range(self.count):
+                sample_seed = int(rng.integers(0, 2**31))
+                samples.append((sample_seed, sample_parameters(space, sample_seed, self.overrides)))
+        except Exception as e:
+            self.hub.publish("start", {"script": script.stem, "count": 0})
+            self.hub.publish("failed", {"message": f"{script.name}: {e}"})
+            return
+
+        preload_imports(script)
+        receiver, sender = self._context.Pipe(duplex=False)
+        prefix = f"{script.stem}_{generation}"
+        self._process = self._context.Process(
+            target=render_job,
+            args=(script, samples, self.output, prefix, self.preview_scale, sender),
+            daemon=True,
+        )
+        self._process.start()
+        sender.close()
+        self.hub.publish("start", {"script": script.stem, "count": self.count})
+        threading.Thread(
+            target=self._forward, args=(receiver, script, generation, changed_at), daemon=True
+        ).start()
+
+    def _forward(self, receiver, script: Path, generation: int, changed_at: float) -> None:
+        """Publish a render job's messages until it finishes or is replaced."""
+        while True:
+            try:
+                message = receiver.recv()
+            except (EOFError, OSError):
+                return
+            if generation != self._generation:
+                return
+            if message.pop("type") == "error":
+                self.hub.publish("failed", {"message": message["message"]})
+                continue
+            message.update(
+                script=script.stem,
+                url=f"/{message.pop('file')}",
+                since_change=time.time() - changed_at,
+            )
+            self.hub.publish("render", message)
+
+
+def poll_changes(scripts_dir: Path, known: dict[Path, float]) -> Path | None:
+    """Update ``known`` mtimes and return the most recently changed script, if any."""
+    changed = None
+    for script in scripts_dir.glob("*.py"):
+        try:
+            mtime = script.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        if known.get(script) != mtime:
+            known[script] = mtime
+            if changed is None or mtime > known[changed]:
+                changed = script
+    return changed
+
+
+@click.command()
+@click.argument(
+    "scripts_dir",
+    default="scripts",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+)
+@click.option("--count", "-n", default=4, type=click.IntRange(min=1), help="Samples rendered per change.")
+@click.option("--seed", "-s", default=0, type=int, help="Batch seed for the samples.")
+@click.option(
+    "--preview-scale",
+    default=0.25,
+    type=click.FloatRange(min=0.01, max=1.0),
+    help="Size of the quick first pass relative to full size (1 to skip it).",
+)
+@click.option("--port", "-p", default=8000, type=int, help="Port of the local page.")
+@click.option(
+    "--script",
+    "initial",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Script to render on start (default: the most recently modified).",
+)
+@click.option(
+    "--set",
+    "assignments",
+    multiple=True,
+    metavar="NAME=VALUE",
+    help="Override a parameter (value parsed as YAML). Repeatable.",
+)
+def main(
+    scripts_dir: Path,
+    count: int,
+    seed: int,
+    preview_scale: float,
+    port: int,
+    initial: Path | None,
+    assignments: tuple[str, ...],
+):
+    """Re-render scripts in SCRIPTS_DIR whenever they change."""
+    try:
+        overrides = parse_overrides(assignments)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+
+    output = Path(mkdtemp(prefix="artlib-watch-"))
+    hub = EventHub()
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", port), partial(WatchHandler, hub=hub, directory=str(output))
+    )
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    click.echo(f"Watching {scripts_dir} - open http://127.0.0.1:{port}/", err=True)
+
+    watcher = Watcher(output, hub, count, seed, overrides, preview_scale)
+    known: dict[Path, float] = {}
+    poll_changes(scripts_dir, known)
+    if initial is None and known:
+        initial = max(known, key=known.get)
+    if initial is not None:
+        watcher.render(initial, time.time())
+    try:
+        while True:
+            time.sleep(POLL_INTERVAL)
+            changed = poll_changes(scripts_dir, known)
+            if changed is not None:
+                click.echo(f"{changed.name} changed, re-rendering", err=True)
+                watcher.render(changed, known[changed])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.cancel()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
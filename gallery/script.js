@@ -39,15 +39,15 @@ async function loadGallery() {
                 const item = document.createElement('div');
                 item.className = 'image-item';
 
-                const img = document.createElement('img');
-                img.src = image.path;
-                img.alt = `${scriptData.script} - ${image.filename}`;
-                img.loading = 'lazy';
+                const alt = `${scriptData.script} - ${image.filename}`;
+                const thumb = scriptData.atlas && image.sprite
+                    ? createSprite(scriptData.atlas, image, alt)
+                    : createImage(image, alt);
 
-                // Add click handler for modal
-                img.addEventListener('click', () => openModal(image.path, img.alt));
+                // Add click handler for modal; the full image loads only here
+                thumb.addEventListener('click', () => openModal(image, alt));
 
-                item.appendChild(img);
+                item.appendChild(thumb);
                 grid.appendChild(item);
             });
 
@@ -60,19 +60,259 @@ async function loadGallery() {
     }
 }
 
-function openModal(imagePath, altText) {
+// Sprites set their atlas once they come near the viewport, so each
+// script's atlas is one request made only when its section is reached
+const atlasObserver = 'IntersectionObserver' in window
+    ? new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                showAtlas(entry.target);
+                atlasObserver.unobserve(entry.target);
+            }
+        });
+    }, { rootMargin: '400px' })
+    : null;
+
+// Thumbnail drawn from the script's atlas. Percentages keep the sprite in
+// place at any cell width: the atlas is scaled so the sprite fills the
+// cell, and positioned so its corner lands on the cell's corner.
+function createSprite(atlas, image, alt) {
+    const sprite = image.sprite;
+    const thumb = document.createElement('div');
+    thumb.className = 'sprite';
+    thumb.setAttribute('role', 'img');
+    thumb.setAttribute('aria-label', alt);
+    thumb.style.aspectRatio = `${sprite.width} / ${sprite.height}`;
+
+    const x = atlas.width > sprite.width ? 100 * sprite.x / (atlas.width - sprite.width) : 0;
+    const y = atlas.height > sprite.height ? 100 * sprite.y / (atlas.height - sprite.height) : 0;
+    thumb.dataset.atlas = atlas.path;
+    thumb.dataset.size = `${100 * atlas.width / sprite.width}% auto`;
+    thumb.dataset.position = `${x}% ${y}%`;
+    if (image.placeholder) {
+        // Blurred preview until the atlas is requested and drawn over it
+        thumb.style.backgroundImage = `url("${image.placeholder}")`;
+    }
+
+    if (atlasObserver) {
+        atlasObserver.observe(thumb);
+    } else {
+        showAtlas(thumb);
+    }
+    return thumb;
+}
+
+function showAtlas(thumb) {
+    const layers = [`url("${thumb.dataset.atlas}")`];
+    const sizes = [thumb.dataset.size];
+    const positions = [thumb.dataset.position];
+    if (thumb.style.backgroundImage) {
+        // The preview stays underneath while the atlas loads
+        layers.push(thumb.style.backgroundImage);
+        sizes.push('cover');
+        positions.push('center');
+    }
+    thumb.style.backgroundImage = layers.join(', ');
+    thumb.style.backgroundSize = sizes.join(', ');
+    thumb.style.backgroundPosition = positions.join(', ');
+}
+
+// Entries published before atlases were added load each image on its own
+function createImage(image, alt) {
+    const img = document.createElement('img');
+    img.src = image.path;
+    img.alt = alt;
+    img.loading = 'lazy';
+    if (image.placeholder) {
+        // Reserve the image's shape and show its blurred preview
+        // until the full image has loaded
+        img.width = image.width;
+        img.height = image.height;
+        img.style.backgroundImage = `url("${image.placeholder}")`;
+        img.addEventListener('load', () => {
+            img.style.backgroundImage = '';
+        }, { once: true });
+    }
+    return img;
+}
+
+let zoomViewer = null;
+
+function openModal(image, altText) {
     const modal = document.getElementById('modal');
     const modalImg = document.getElementById('modal-image');
+    const zoomContainer = document.getElementById('modal-zoom');
     const caption = document.getElementById('modal-caption');
 
     modal.style.display = 'block';
-    modalImg.src = imagePath;
     caption.textContent = altText;
+
+    if (image.dzi) {
+        // Large image: load only the deep-zoom tiles in view
+        modalImg.style.display = 'none';
+        zoomContainer.style.display = 'block';
+        zoomViewer = createZoomViewer(zoomContainer, image.dzi);
+    } else {
+        zoomContainer.style.display = 'none';
+        modalImg.style.display = 'block';
+        modalImg.src = image.path;
+    }
 }
 
 function closeModal() {
     const modal = document.getElementById('modal');
     modal.style.display = 'none';
+
+    if (zoomViewer) {
+        zoomViewer.destroy();
+        zoomViewer = null;
+    }
+}
+
+function createZoomViewer(container, dzi) {
+    const tilesPath = dzi.path.replace(/\.dzi$/, '_files');
+    const maxLevel = Math.ceil(Math.log2(Math.max(dzi.width, dzi.height)));
+    const tiles = new Map();
+    let scale = 1;
+    let offsetX = 0;
+    let offsetY = 0;
+    let baseLevel = 0;
+    let drag = null;
+
+    function levelFor(viewScale) {
+        // Coarsest level with at least one level pixel per screen pixel
+        return Math.min(maxLevel, Math.max(0, maxLevel + Math.ceil(Math.log2(viewScale))));
+    }
+
+    function visibleTiles(level, wanted) {
+        const levelScale = 2 ** (maxLevel - level);
+        const levelWidth = Math.ceil(dzi.width / levelScale);
+        const levelHeight = Math.ceil(dzi.height / levelScale);
+        const span = dzi.tile_size * levelScale * scale;
+
+        const x0 = Math.max(0, -offsetX);
+        const y0 = Math.max(0, -offsetY);
+        const x1 = Math.min(dzi.width * scale, container.clientWidth - offsetX);
+        const y1 = Math.min(dzi.height * scale, container.clientHeight - offsetY);
+        if (x1 <= x0 || y1 <= y0) {
+            return;
+        }
+
+        for (let row = Math.floor(y0 / span); row <= Math.floor((y1 - 1) / span); row++) {
+            for (let col = Math.floor(x0 / span); col <= Math.floor((x1 - 1) / span); col++) {
+                const left = Math.max(0, col * dzi.tile_size - dzi.overlap);
+                const top = Math.max(0, row * dzi.tile_size - dzi.overlap);
+                const right = Math.min(levelWidth, (col + 1) * dzi.tile_size + dzi.overlap);
+                const bottom = Math.min(levelHeight, (row + 1) * dzi.tile_size + dzi.overlap);
+                wanted.set(`${level}/${col}_${row}`, {
+                    level,
+                    left: left * levelScale,
+                    top: top * levelScale,
+                    width: (right - left) * levelScale,
+                    height: (bottom - top) * levelScale,
+                });
+            }
+        }
+    }
+
+    function update() {
+        const wanted = new Map();
+        // The fitted level stays underneath while sharper tiles load
+        visibleTiles(baseLevel, wanted);
+        visibleTiles(levelFor(scale), wanted);
+
+        tiles.forEach((tile, key) => {
+            if (!wanted.has(key)) {
+                tile.remove();
+                tiles.delete(key);
+            }
+        });
+
+        wanted.forEach((spec, key) => {
+            let tile = tiles.get(key);
+            if (!tile) {
+                tile = document.createElement('img');
+                tile.src = `${tilesPath}/${key}.${dzi.format}`;
+                tile.style.zIndex = spec.level;
+                tile.draggable = false;
+                container.appendChild(tile);
+                tiles.set(key, tile);
+            }
+            tile.style.left = `${offsetX + spec.left * scale}px`;
+            tile.style.top = `${offsetY + spec.top * scale}px`;
+            tile.style.width = `${spec.width * scale}px`;
+            tile.style.height = `${spec.height * scale}px`;
+        });
+    }
+
+    function zoomAt(factor, x, y) {
+        const fitScale = Math.min(container.clientWidth / dzi.width, container.clientHeight / dzi.height);
+        const newScale = Math.min(4, Math.max(fitScale, scale * factor));
+        offsetX = x - (x - offsetX) * newScale / scale;
+        offsetY = y - (y - offsetY) * newScale / scale;
+        scale = newScale;
+        update();
+    }
+
+    function onWheel(e) {
+        e.preventDefault();
+        const rect = container.getBoundingClientRect();
+        zoomAt(e.deltaY < 0 ? 1.25 : 0.8, e.clientX - rect.left, e.clientY - rect.top);
+    }
+
+    function onPointerDown(e) {
+        drag = { x: e.clientX, y: e.clientY };
+        container.setPointerCapture(e.pointerId);
+    }
+
+    function onPointerMove(e) {
+        if (!drag) {
+            return;
+        }
+        offsetX += e.clientX - drag.x;
+        offsetY += e.clientY - drag.y;
+        drag = { x: e.clientX, y: e.clientY };
+        update();
+    }
+
+    function onPointerUp() {
+        drag = null;
+    }
+
+    function onDoubleClick(e) {
+        const rect = container.getBoundingClientRect();
+        zoomAt(2, e.clientX - rect.left, e.clientY - rect.top);
+    }
+
+    // Start fitted and centred
+    scale = Math.min(container.clientWidth / dzi.width, container.clientHeight / dzi.height);
+    offsetX = (container.clientWidth - dzi.width * scale) / 2;
+    offsetY = (container.clientHeight - dzi.height * scale) / 2;
+    baseLevel = levelFor(scale);
+
+    container.addEventListener('wheel', onWheel, { passive: false });
+    container.addEventListener('pointerdown', onPointerDown);
+    container.addEventListener('pointermove', onPointerMove);
+    container.addEventListener('pointerup', onPointerUp);
+    container.addEventListener('dblclick', onDoubleClick);
+    update();
+
+    return {
+        destroy() {
+            container.removeEventListener('wheel', onWheel);
+            container.removeEventListener('pointerdown', onPointerDown);
+            container.removeEventListener('pointermove', onPointerMove);
+            container.removeEventListener('pointerup', onPointerUp);
+            container.removeEventListener('dblclick', onDoubleClick);
+            tiles.forEach(tile => tile.remove());
+            tiles.clear();
+        },
+    };
+}
+
+if ('serviceWorker' in navigator) {
+    // Caches the page and its content-hashed images for repeat and offline visits
+    navigator.serviceWorker.register('sw.js');
 }
 
 document.addEventListener('DOMContentLoaded', () => {
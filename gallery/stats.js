@@ -0,0 +1,104 @@
+// Charts the per-build render metrics in history.json (see artlib/metrics.py).
+
+const METRICS = [
+    { column: 'wall', label: 'Wall time', format: v => `${v.toFixed(2)}s` },
+    { column: 'cpu', label: 'CPU time', format: v => `${v.toFixed(2)}s` },
+    { column: 'peak_rss', label: 'Peak RSS', format: v => `${(v / 2 ** 20).toFixed(0)} MiB` },
+    { column: 'bytes', label: 'Output size', format: v => `${(v / 1024).toFixed(0)} KiB` },
+];
+
+// Must match DEFAULT_WINDOW and DEFAULT_THRESHOLD in artlib/metrics.py
+const WINDOW = 5;
+const THRESHOLD = 1.5;
+
+function median(values) {
+    const sorted = [...values].sort((a, b) => a - b);
+    const middle = Math.floor(sorted.length / 2);
+    return sorted.length % 2 ? sorted[middle] : (sorted[middle - 1] + sorted[middle]) / 2;
+}
+
+function sparkline(values, width = 240, height = 60) {
+    const ns = 'http://www.w3.org/2000/svg';
+    const svg = document.createElementNS(ns, 'svg');
+    svg.setAttribute('viewBox', `0 0 ${width} ${height}`);
+    svg.setAttribute('class', 'sparkline');
+    const points = values.filter(v => v !== null);
+    if (points.length === 0) {
+        return svg;
+    }
+    const max = Math.max(...points) || 1;
+    const step = values.length > 1 ? width / (values.length - 1) : 0;
+    const coords = [];
+    values.forEach((v, i) => {
+        if (v !== null) {
+            coords.push(`${(i * step).toFixed(1)},${(height - 4 - (v / max) * (height - 8)).toFixed(1)}`);
+        }
+    });
+    const line = document.createElementNS(ns, 'polyline');
+    line.setAttribute('points', coords.join(' '));
+    svg.appendChild(line);
+    return svg;
+}
+
+async function loadStats() {
+    const container = document.getElementById('stats-container');
+    try {
+        const response = await fetch('history.json');
+        if (!response.ok) {
+            container.innerHTML = '<div class="loading">No render history yet.</div>';
+            return;
+        }
+        const history = await response.json();
+        const columns = history.columns;
+        container.innerHTML = '';
+
+        history.scripts.forEach((script, index) => {
+            const rows = columns.script.flatMap((s, i) => (s === index ? [i] : []));
+            if (rows.length === 0) {
+                return;
+            }
+            const section = document.createElement('div');
+            section.className = 'script-section';
+
+            const title = document.createElement('h2');
+            title.textContent = script.replace(/_/g, ' ');
+            const walls = rows.map(i => columns.wall[i]);
+            const earlier = walls.slice(-WINDOW - 1, -1);
+            if (earlier.length && walls[walls.length - 1] > THRESHOLD * median(earlier)) {
+                const flag = document.createElement('span');
+                flag.className = 'regression';
+                flag.textContent = 'slower than recent builds';
+                title.appendChild(flag);
+            }
+            section.appendChild(title);
+
+            const grid = document.createElement('div');
+            grid.className = 'stats-grid';
+            METRICS.forEach(metric => {
+                const values = rows.map(i => columns[metric.column][i]);
+                const latest = values[values.length - 1];
+                const cell = document.createElement('div');
+                cell.className = 'stat';
+                const label = document.createElement('div');
+                label.className = 'stat-label';
+                label.textContent = `${metric.label}: ${latest === null ? 'n/a' : metric.format(latest)}`;
+                cell.append(label, sparkline(values));
+                grid.appendChild(cell);
+            });
+            section.appendChild(grid);
+
+            const builds = document.createElement('div');
+            builds.className = 'stat-label';
+            const first = new Date(columns.time[rows[0]] * 1000).toLocaleDateString();
+            builds.textContent = `${rows.length} builds since ${first}`;
+            section.appendChild(builds);
+
+            container.appendChild(section);
+        });
+    } catch (error) {
+        container.innerHTML = '<div class="loading">Error loading render history.</div>';
+        console.error('Error loading history:', error);
+    }
+}
+
+document.addEventListener('DOMContentLoaded', loadStats);
@@ -0,0 +1,124 @@
+// Service worker for the gallery.
+//
+// Published images, their deep-zoom tiles and the thumbnail atlases are named
+// after their content, so a cached copy never goes stale: they are served
+// cache-first. gallery.json is fetched from the network first, because a
+// deploy deletes the images an old index names; the cached copy is only used
+// offline. The page shell is precached and served from the cache while a
+// fresh copy is fetched for the next visit, which keeps repeat visits instant
+// and lets the gallery open offline.
+
+const SHELL_CACHE = 'gallery-shell-v1';
+const IMAGE_CACHE = 'gallery-images-v1';
+const SHELL = ['./', 'index.html', 'style.css', 'script.js', 'gallery.json'];
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(cache => cache.addAll(SHELL))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    const current = [SHELL_CACHE, IMAGE_CACHE];
+    event.waitUntil(
+        caches.keys()
+            .then(names => Promise.all(
+                names.filter(name => !current.includes(name)).map(name => caches.delete(name))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const url = new URL(event.request.url);
+    if (event.request.method !== 'GET' || url.origin !== self.location.origin) {
+        return;
+    }
+    const path = relativePath(url);
+    if (path.startsWith('images/')) {
+        event.respondWith(cacheFirst(event.request));
+    } else if (path === 'gallery.json') {
+        event.respondWith(networkFirst(event));
+    } else {
+        event.respondWith(staleWhileRevalidate(event));
+    }
+});
+
+// Path relative to the gallery root, e.g. 'images/circles/circles_0_1.0123456789ab.png'.
+function relativePath(url) {
+    return url.pathname.slice(new URL(self.registration.scope).pathname.length);
+}
+
+async function cacheFirst(request) {
+    const cache = await caches.open(IMAGE_CACHE);
+    const cached = await cache.match(request);
+    if (cached) {
+        return cached;
+    }
+    const response = await fetch(request);
+    if (response.ok) {
+        cache.put(request, response.clone());
+    }
+    return response;
+}
+
+// The page renders from the index this returns, so images it no longer uses
+// can be pruned as soon as a fresh one arrives.
+async function networkFirst(event) {
+    const cache = await caches.open(SHELL_CACHE);
+    let response;
+    try {
+        response = await fetch(event.request);
+    } catch (error) {
+        response = null;
+    }
+    if (response && response.ok) {
+        await cache.put(event.request, response.clone());
+        event.waitUntil(response.clone().json().then(pruneImages).catch(() => {}));
+        return response;
+    }
+    // Offline or failing: the last index is better than none
+    const cached = await cache.match(event.request);
+    return cached || response || Response.error();
+}
+
+async function staleWhileRevalidate(event) {
+    const cache = await caches.open(SHELL_CACHE);
+    const cached = await cache.match(event.request);
+    const refresh = fetch(event.request).then(async response => {
+        if (response.ok) {
+            await cache.put(event.request, response.clone());
+        }
+        return response;
+    });
+    if (cached) {
+        // Update in the background; the next visit sees the new version
+        event.waitUntil(refresh.catch(() => {}));
+        return cached;
+    }
+    return refresh;
+}
+
+// Drop cached images (and tiles) that the current gallery no longer uses.
+async function pruneImages(gallery) {
+    const stems = new Set();
+    gallery.forEach(entry => {
+        if (entry.atlas) {
+            stems.add(entry.atlas.path.replace(/\.[^./]+$/, ''));
+        }
+        entry.images.forEach(image => {
+            stems.add(image.path.replace(/\.[^./]+$/, ''));
+        });
+    });
+    const cache = await caches.open(IMAGE_CACHE);
+    for (const request of await cache.keys()) {
+        const path = relativePath(new URL(request.url));
+        // Tiles live in <stem>_files/, next to the <stem>.dzi descriptor
+        const stem = path.replace(/(_files\/.*|\.[^./]+)$/, '');
+        if (!stems.has(stem)) {
+            await cache.delete(request);
+        }
+    }
+}
@@ -19,7 +19,7 @@ parameters:
     high: 4500
   - name: arrangement_type
     distribution: choice
-    values: ["random", "grid", "spiral"]
+    values: ["random", "grid", "spiral", "poisson"]
   - name: palette_name
     distribution: choice
     values: ["vibrant", "pastel", "earthy", "oceanic"]
@@ -33,11 +33,15 @@ parameters:
     distribution: uniform
     loc: 0.0
     scale: 5.0
+  - name: supersample
+    distribution: constant
+    value: 4
 """
 
-from PIL import Image, ImageDraw
 import random
 import math
+from artlib.canvas import Canvas
+from artlib.spatial import poisson_disk
 
 random.seed(seed)
 
@@ -206,8 +210,8 @@ def draw_abstract_person(draw, x, y, scale, color):
 
 # Initialize Image: Use RGBA for transparency support (for shadows) then convert to RGB
 bg_color = "#f5f5f5"  # Always light background now
-img = Image.new("RGBA", (width, height), bg_color)
-draw = ImageDraw.Draw(img)
+canvas = Canvas((width, height), "RGBA", bg_color, supersample=supersample)
+draw = canvas.draw
 
 colors = get_palette(palette_name)
 
@@ -303,10 +307,52 @@ elif arrangement_type == "spiral":
                 scale = min_scale + normalized_y * (max_scale - min_scale)
                 people.append((y, x, scale, random.choice(colors)))
 
+elif arrangement_type == "poisson":
+    # Variable-radius Poisson-disk sampling: no two figures closer than the
+    # local spacing, which grows with figure scale toward the front and
+    # shrinks where the density map is high
+    density_floor = 0.35  # Caps the spacing in the voids
+
+    def spacing(x, y):
+        normalized_y = (y - min_y) / (max_y - min_y)
+        scale = min_scale + normalized_y * (max_scale - min_scale)
+        return scale / max(simple_noise(x, y, seed_offset=seed), density_floor)
+
+    # A filled frame holds about 0.63 figures per squared spacing; estimate
+    # the frame's total on a coarse grid and aim a little over num_people
+    cells = 32
+    cell_w = (max_x - min_x) / cells
+    cell_h = (max_y - min_y) / cells
+    coverage = sum(
+        cell_w * cell_h / spacing(min_x + (i + 0.5) * cell_w, min_y + (j + 0.5) * cell_h) ** 2
+        for i in range(cells)
+        for j in range(cells)
+    )
+    base = math.sqrt(0.6 * coverage / num_people)
+    while True:
+        points = poisson_disk(
+            (min_x, min_y, max_x, max_y),
+            lambda x, y: base * spacing(x, y),
+            base * max(min_scale, max_scale) / density_floor,
+            random,
+        )
+        if len(points) >= num_people:
+            break
+        base *= 0.97 * math.sqrt(len(points) / num_people)
+
+    # Thinning keeps the spacing and lands exactly on the requested count
+    for x, y in random.sample(points, num_people):
+        normalized_y = (y - min_y) / (max_y - min_y)
+        scale = min_scale + normalized_y * (max_scale - min_scale)
+        scale *= random.uniform(0.9, 1.1)
+        people.append((y, x, scale, random.choice(colors)))
+
 people.sort(key=lambda p: p[0])
 
 for p in people:
     y, x, s, c = p
     draw_abstract_person(draw, x, y, s, c)
 
-img.convert("RGB")
+img = canvas.render("RGB")
+
+img
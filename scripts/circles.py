@@ -26,21 +26,78 @@ parameters:
     low: 10
     high: 50
     mode: distribution
+  - name: supersample
+    distribution: constant
+    value: 4
+  - name: layout
+    distribution: choice
+    values: ["scatter", "packing"]
+  - name: max_circles
+    distribution: constant
+    value: 20000
+  - name: min_radius
+    distribution: constant
+    value: 1.5
+  - name: gap
+    distribution: constant
+    value: 1.0
 """
 
-from PIL import Image, ImageDraw
-import random
+import numpy as np
+from artlib.canvas import Canvas
+from artlib.rng import RandomStreams
+from artlib.sampling import pooled
+from artlib.spatial import DiscGrid
+
+radius, colour = pooled(radius, colour)
+
+canvas = Canvas((width, height), "RGB", background, supersample=supersample)
+draw = canvas.draw
 
-random.seed(seed)
+if layout == "packing":
+    # Circles with radii from the radius distribution are tried at random
+    # positions and kept if they stay clear of every placed circle. Every
+    # max_failures rejections in a row the radii are scaled down to fill
+    # the smaller gaps (never below min_radius). Packing ends at max_circles,
+    # or when stop_failures candidates in a row are rejected.
+    tries = RandomStreams(seed).stage("circles.packing")
+    grid = DiscGrid(cell_size=4 * min_radius)
+    block = 4096
+    max_failures = 500
+    stop_failures = 4 * max_failures
+    shrink = 1.0
+    failures = 0
+    attempt = 0
+    placed = 0
+    while failures < stop_failures and placed < max_circles:
+        positions = tries.uniform(np.arange(attempt, attempt + block), 2, 0, np.array([width, height]))
+        radii = np.maximum(shrink * radius.rvs(block), min_radius)
+        attempt += block
+        for (x, y), r in zip(positions.tolist(), radii.tolist()):
+            if grid.overlaps(x, y, r, gap):
+                failures += 1
+                if failures % max_failures == 0:
+                    # Draw the next radii at the new scale
+                    shrink *= 0.85
+                    break
+                continue
+            grid.insert(x, y, r)
+            draw.ellipse([x - r, y - r, x + r, y + r], fill=colour.rvs())
+            failures = 0
+            placed += 1
+            if placed == max_circles:
+                break
+else:
+    # Each circle's position comes from its own stream, so circles are independent
+    centres = RandomStreams(seed).stage("circles.centre").integers(
+        np.arange(num_circles), 2, 0, np.array([width + 1, height + 1])
+    )
 
-img = Image.new("RGB", (width, height), background)
-draw = ImageDraw.Draw(img)
+    for x, y in centres:
+        r = int(radius.rvs())
+        c = colour.rvs()
+        draw.ellipse([x - r, y - r, x + r, y + r], fill=c)
 
-for _ in range(num_circles):
-    x = random.randint(0, width)
-    y = random.randint(0, height)
-    r = int(radius.rvs())
-    c = colour.rvs()
-    draw.ellipse([x - r, y - r, x + r, y + r], fill=c)
+img = canvas.render()
 
 img
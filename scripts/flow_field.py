@@ -52,16 +52,42 @@ parameters:
     distribution: uniform
     loc: 2
     scale: 4
+  - name: layout
+    distribution: choice
+    values: ["jittered", "streamlines"]
+  - name: separation
+    distribution: uniform
+    loc: 6
+    scale: 10
+  - name: supersample
+    distribution: constant
+    value: 4
+  - name: noise_drift
+    distribution: uniform
+    loc: 0.005
+    scale: 0.02
+  - name: trail_fade
+    distribution: uniform
+    loc: 0.02
+    scale: 0.08
 """
 
-from PIL import Image, ImageDraw
 import math
-import random
+from collections import deque
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw
+from artlib.animate import current_animation
+from artlib.canvas import Canvas
+from artlib.rng import RandomStreams
+from artlib.sampling import pooled
+from artlib.spatial import UniformGrid
 
-random.seed(seed)
+line_length, line_width, line_alpha, line_colour = pooled(
+    line_length, line_width, line_alpha, line_colour
+)
 
-img = Image.new("RGBA", (width, height), background)
-draw = ImageDraw.Draw(img)
+canvas = Canvas((width, height), "RGBA", background, supersample=supersample)
+draw = canvas.draw
 
 
 def noise_angle(x, y, scale, offset):
@@ -74,16 +100,37 @@ def noise_angle(x, y, scale, offset):
     ) * math.pi * turbulence
 
 
-def draw_flow_line(start_x, start_y):
-    x, y = start_x, start_y
-    points = [(x, y)]
+def noise_angles(xs, ys, offset):
+    """noise_angle for arrays of points."""
+    nx = xs * noise_scale + offset
+    ny = ys * noise_scale + offset
+    return (
+        np.sin(nx * 1.5) * np.cos(ny * 1.5) +
+        np.sin(nx * 0.7 + ny * 0.5) * 0.5 +
+        np.cos(nx * 0.3 - ny * 0.8) * 0.3
+    ) * math.pi * turbulence
 
+
+def stroke(points):
+    """Draw a traced line, fading out along its length."""
     # Sample line properties for this line
-    length = int(line_length.rvs())
     lwidth = int(line_width.rvs())
     alpha_mult = line_alpha.rvs()
     colour = line_colour.rvs()
 
+    if len(points) > 1:
+        for i in range(len(points) - 1):
+            progress = i / len(points)
+            alpha = int(255 * (1 - progress) * alpha_mult)
+            colour_with_alpha = colour + f"{alpha:02x}"
+            draw.line([points[i], points[i + 1]], fill=colour_with_alpha, width=lwidth)
+
+
+def draw_flow_line(start_x, start_y):
+    x, y = start_x, start_y
+    points = [(x, y)]
+    length = int(line_length.rvs())
+
     for _ in range(length):
         angle = noise_angle(x, y, noise_scale, noise_offset)
         x += math.cos(angle) * step_size
@@ -93,22 +140,164 @@ def draw_flow_line(start_x, start_y):
             break
         points.append((x, y))
 
-    if len(points) > 1:
-        for i in range(len(points) - 1):
-            progress = i / len(points)
-            alpha = int(255 * (1 - progress) * alpha_mult)
-            colour_with_alpha = colour + f"{alpha:02x}"
-            draw.line([points[i], points[i + 1]], fill=colour_with_alpha, width=lwidth)
+    stroke(points)
+
+
+def trace_streamline(seed_x, seed_y, line_id, grid):
+    """Grow a line both ways from a seed until it leaves the image or nears a line.
+
+    Points go into ``grid`` as they are traced so a line also stops before
+    running into itself; its own last few points are ignored for that check.
+    Points are tagged ``(line_id, step)``, with negative steps going backwards.
+    """
+    test_distance = 0.5 * separation
+    lag = math.ceil(2 * test_distance / step_size) + 1
+    max_steps = int(4 * (width + height) / step_size)
+    halves = []
+    for direction in (1, -1):
+        x, y = seed_x, seed_y
+        half = []
+        for step in range(1, max_steps):
+            angle = noise_angle(x, y, noise_scale, noise_offset)
+            x += direction * math.cos(angle) * step_size
+            y += direction * math.sin(angle) * step_size
+            if x < 0 or x >= width or y < 0 or y >= height:
+                break
+            order = direction * step
+            if grid.any_within(
+                x, y, test_distance,
+                lambda tag: tag[0] == line_id and abs(tag[1] - order) <= lag,
+            ):
+                break
+            grid.insert(x, y, (line_id, order))
+            half.append((x, y))
+        halves.append(half)
+
+    forward, backward = halves
+    if not forward and not backward:
+        return []
+    grid.insert(seed_x, seed_y, (line_id, 0))
+    return backward[::-1] + [(seed_x, seed_y)] + forward
+
+
+def draw_streamlines(seeds):
+    """Evenly spaced streamlines (Jobard & Lefer 1997).
+
+    New lines are seeded at ``separation`` to either side of the points of
+    lines already drawn, breadth first, and only where no line is that close.
+    When those run out, the next of ``seeds`` that is still clear starts a new
+    front, which fills regions the offsets cannot reach.
+    """
+    grid = UniformGrid(separation)
+    lines = []
+
+    def try_seed(x, y):
+        if not (0 <= x < width and 0 <= y < height) or grid.any_within(x, y, separation):
+            return
+        points = trace_streamline(x, y, len(lines), grid)
+        if points:
+            lines.append(points)
+            queue.append(points)
+
+    # Candidates about a separation apart: a gap any shorter along the line
+    # is too narrow to start a line in anyway
+    stride = max(1, round(separation / step_size))
+    queue = deque()
+    for seed_x, seed_y in seeds:
+        try_seed(seed_x, seed_y)
+        while queue:
+            points = queue.popleft()
+            last = len(points) - 1
+            for i in range(0, len(points), stride):
+                # Normal from the neighbouring points of the line itself
+                (ax, ay), (bx, by) = points[max(i - 1, 0)], points[min(i + 1, last)]
+                norm = math.hypot(bx - ax, by - ay)
+                nx = (ay - by) / norm * separation
+                ny = (bx - ax) / norm * separation
+                px, py = points[i]
+                try_seed(px + nx, py + ny)
+                try_seed(px - nx, py - ny)
+    return lines
+
+
+def animate_particles(starts, animation):
+    """Advect one particle per start, one step per frame.
+
+    Each frame fades the previous one towards the background by
+    ``trail_fade`` and draws every particle's latest step on top, so trails
+    build up without redrawing their history. The field drifts by
+    ``noise_drift`` per frame. A particle that leaves the image or outlives
+    its line length respawns at a random point.
+    """
+    rng = np.random.default_rng(seed)
+    xs, ys = np.array(starts, dtype=float).T
+    lifetimes = np.array([int(line_length.rvs()) for _ in starts])
+    # Staggered ages, so particles do not all respawn on the same frame
+    ages = rng.integers(0, lifetimes)
+    styles = [
+        (ImageColor.getrgb(line_colour.rvs()) + (int(255 * line_alpha.rvs()),), int(line_width.rvs()))
+        for _ in starts
+    ]
+    # Trail fade as a lookup table per channel: every level moves part of the
+    # way back to the background, and at least one step, so trails vanish
+    levels = np.arange(256)
+    fade_table = []
+    for target in ImageColor.getrgb(background)[:3]:
+        diff = levels - target
+        fade_table += (levels - np.sign(diff) * np.ceil(np.abs(diff) * trail_fade)).astype(int).tolist()
+
+    image = Image.new("RGB", (width, height), background)
+    for index in range(animation.frames):
+        angles = noise_angles(xs, ys, noise_offset + index * noise_drift)
+        new_xs = xs + np.cos(angles) * step_size
+        new_ys = ys + np.sin(angles) * step_size
+
+        image = image.point(fade_table)
+        draw = ImageDraw.Draw(image, "RGBA")
+        inside = (new_xs >= 0) & (new_xs < width) & (new_ys >= 0) & (new_ys < height)
+        for i in np.flatnonzero(inside).tolist():
+            colour, lwidth = styles[i]
+            draw.line([(xs[i], ys[i]), (new_xs[i], new_ys[i])], fill=colour, width=lwidth)
+        animation.put(image)
+
+        ages += 1
+        respawn = ~inside | (ages >= lifetimes)
+        new_xs[respawn] = rng.uniform(0, width, respawn.sum())
+        new_ys[respawn] = rng.uniform(0, height, respawn.sum())
+        ages[respawn] = 0
+        xs, ys = new_xs, new_ys
+    return image
 
 
 grid_size = int(math.sqrt(num_lines))
 spacing_x = width / grid_size
 spacing_y = height / grid_size
 
+# Start jitter per grid cell, indexed by cell so lines are independent
+jitter = RandomStreams(seed).stage("flow_field.start").uniform(
+    np.arange(grid_size * grid_size), 2, -0.3, 0.3
+)
+
+starts = []
 for i in range(grid_size):
     for j in range(grid_size):
-        x = i * spacing_x + random.uniform(-spacing_x * 0.3, spacing_x * 0.3)
-        y = j * spacing_y + random.uniform(-spacing_y * 0.3, spacing_y * 0.3)
-        draw_flow_line(x, y)
+        jx, jy = jitter[i * grid_size + j]
+        x = i * spacing_x + jx * spacing_x
+        y = j * spacing_y + jy * spacing_y
+        starts.append((x, y))
+
+animation = current_animation()
+if animation is not None:
+    # Frames go straight to the animation; the last one is the still image
+    img = animate_particles(starts, animation)
+else:
+    if layout == "streamlines":
+        for points in draw_streamlines(starts):
+            stroke(points)
+    else:
+        for x, y in starts:
+            draw_flow_line(x, y)
+
+    img = canvas.render()
 
 img
@@ -46,22 +46,24 @@ parameters:
 from PIL import Image, ImageDraw, ImageEnhance, ImageChops
 import random
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 import math
 
 random.seed(seed)
 
+# Rows per band of the blend chain; bands are blended on separate threads
+BAND_ROWS = 128
+
 def fetch_image(width, height, seed_val):
+    """Download a random photo, or None if the fetch fails."""
     url = f"https://picsum.photos/{width}/{height}?random={seed_val}"
     try:
         response = requests.get(url, timeout=10)
         response.raise_for_status()
         return Image.open(BytesIO(response.content)).convert("RGB")
     except Exception as e:
-        # Fallback to solid colour if fetch fails
-        fallback = Image.new("RGB", (width, height),
-                            (random.randint(50, 200), random.randint(50, 200), random.randint(50, 200)))
-        return fallback
+        return None
 
 def apply_blend(base, overlay, mode):
     if mode == "multiply":
@@ -99,20 +101,32 @@ def add_glitch_effect(img, intensity):
 
     return Image.merge("RGB", (r, g, b))
 
-# Fetch random images from the internet
+# Fetch random images from the internet, all at once
 print(f"Fetching {num_images} images from the internet...")
+with ThreadPoolExecutor() as pool:
+    fetched = list(pool.map(lambda i: fetch_image(width, height, seed + i * 1000), range(num_images)))
+
 images = []
-for i in range(num_images):
-    img_seed = seed + i * 1000
-    img = fetch_image(width, height, img_seed)
+for img in fetched:
+    if img is None:
+        # Fallback to solid colour if fetch fails, drawn in image order
+        img = Image.new("RGB", (width, height),
+                        (random.randint(50, 200), random.randint(50, 200), random.randint(50, 200)))
     images.append(img)
 
-# Start with first image as base
-result = images[0].copy()
-
-# Blend subsequent images
-for i in range(1, len(images)):
-    result = apply_blend(result, images[i], blend_mode)
+def blend_band(box):
+    # Every blend mode is per pixel, so each band can be blended on its own
+    band = images[0].crop(box)
+    for img in images[1:]:
+        band = apply_blend(band, img.crop(box), blend_mode)
+    return band
+
+# Blend subsequent images onto the first, band by band
+result = Image.new("RGB", (width, height))
+bands = [(0, y, width, min(y + BAND_ROWS, height)) for y in range(0, height, BAND_ROWS)]
+with ThreadPoolExecutor() as pool:
+    for box, band in zip(bands, pool.map(blend_band, bands)):
+        result.paste(band, box[:2])
 
 # Apply colour shift
 shift_r = int(colour_shift + random.uniform(-20, 20))
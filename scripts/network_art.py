@@ -46,75 +46,113 @@ parameters:
     loc: 0.5
     scale: 2
     mode: distribution
+  - name: edge_style
+    distribution: choice
+    values: ["straight", "bundled"]
+  - name: supersample
+    distribution: constant
+    value: 4
 """
 
-from PIL import Image, ImageDraw
 import random
 import networkx as nx
 import math
+import numpy as np
+from artlib import graphs
+from artlib.bundling import bundle_edges
+from artlib.cache import memoize
+from artlib.canvas import Canvas
+from artlib.sampling import pooled
 
 random.seed(seed)
+node_size, edge_thickness = pooled(node_size, edge_thickness)
 
 # Create image
-img = Image.new("RGBA", (width, height), background)
-draw = ImageDraw.Draw(img)
-
-# Generate network based on type
-if network_type == "barabasi_albert":
-    # Scale-free network (preferential attachment)
-    m = max(2, num_nodes // 20)
-    G = nx.barabasi_albert_graph(num_nodes, m, seed=seed)
-elif network_type == "watts_strogatz":
-    # Small-world network
-    k = max(4, num_nodes // 10)
+canvas = Canvas((width, height), "RGBA", background, supersample=supersample)
+draw = canvas.draw
+
+# Random generator parameters are drawn up front, outside the cached stage, so
+# the global random sequence is the same whether or not the graph is cached
+if network_type == "watts_strogatz":
     p = random.uniform(0.1, 0.3)
-    G = nx.watts_strogatz_graph(num_nodes, k, p, seed=seed)
 elif network_type == "random_geometric":
-    # Geometric network (nodes connected if close enough)
     radius = random.uniform(0.15, 0.25)
-    G = nx.random_geometric_graph(num_nodes, radius, seed=seed)
 elif network_type == "erdos_renyi":
-    # Random network
     p = random.uniform(0.02, 0.08)
-    G = nx.erdos_renyi_graph(num_nodes, p, seed=seed)
-else:  # powerlaw_cluster
-    # Powerlaw cluster network
-    m = max(2, num_nodes // 30)
+elif network_type == "powerlaw_cluster":
     p = random.uniform(0.1, 0.5)
-    G = nx.powerlaw_cluster_graph(num_nodes, m, p, seed=seed)
 
-# Calculate layout
-margin = 100
-if layout_type == "spring":
-    pos = nx.spring_layout(G, seed=seed, k=1/math.sqrt(num_nodes))
-elif layout_type == "circular":
-    pos = nx.circular_layout(G)
-elif layout_type == "shell":
-    pos = nx.shell_layout(G)
-else:  # random
-    pos = nx.random_layout(G, seed=seed)
-
-# For random_geometric, use the built-in positions
-if network_type == "random_geometric":
-    pos = nx.get_node_attributes(G, 'pos')
 
-# Scale positions to fit canvas with margin
-min_x = min(x for x, y in pos.values())
-max_x = max(x for x, y in pos.values())
-min_y = min(y for x, y in pos.values())
-max_y = max(y for x, y in pos.values())
+def build_network():
+    """Edge array and (num_nodes, 2) node positions of the network."""
+    rng = np.random.default_rng(seed)
+    positions = None
+    # Generate network based on type
+    if network_type == "barabasi_albert":
+        # Scale-free network (preferential attachment)
+        m = max(2, num_nodes // 20)
+        edges = graphs.barabasi_albert(num_nodes, m, rng)
+    elif network_type == "watts_strogatz":
+        # Small-world network
+        k = max(4, num_nodes // 10)
+        edges = graphs.watts_strogatz(num_nodes, k, p, rng)
+    elif network_type == "random_geometric":
+        # Geometric network (nodes connected if close enough), laid out where
+        # the nodes were placed
+        positions, edges = graphs.random_geometric(num_nodes, radius, rng)
+    elif network_type == "erdos_renyi":
+        # Random network
+        edges = graphs.erdos_renyi(num_nodes, p, rng)
+    else:  # powerlaw_cluster
+        # Powerlaw cluster network
+        m = max(2, num_nodes // 30)
+        edges = graphs.powerlaw_cluster(num_nodes, m, p, rng)
+
+    # Calculate layout
+    if positions is None:
+        nodes = range(num_nodes)
+        if layout_type == "spring":
+            G = nx.Graph()
+            G.add_nodes_from(nodes)
+            G.add_edges_from(edges.tolist())
+            pos = nx.spring_layout(G, seed=seed, k=1/math.sqrt(num_nodes))
+        elif layout_type == "circular":
+            pos = nx.circular_layout(nodes)
+        elif layout_type == "shell":
+            pos = nx.shell_layout(nodes)
+        else:  # random
+            pos = nx.random_layout(nodes, seed=seed)
+        positions = np.array([pos[node] for node in nodes])
+
+    return edges, positions
+
+
+# Graph and layout depend only on these inputs (the drawn generator parameter
+# is the first draw after seeding, so it is determined by seed)
+graph_inputs = {"network_type": network_type, "num_nodes": num_nodes, "seed": seed, "layout_type": layout_type}
+edges, positions = memoize("network_art.edges", graph_inputs, build_network)
 
-scaled_pos = {}
-for node, (x, y) in pos.items():
-    scaled_x = margin + (x - min_x) / (max_x - min_x) * (width - 2 * margin)
-    scaled_y = margin + (y - min_y) / (max_y - min_y) * (height - 2 * margin)
-    scaled_pos[node] = (scaled_x, scaled_y)
+# Scale positions to fit canvas with margin
+margin = 100
+low = positions.min(axis=0)
+span = positions.max(axis=0) - low
+scaled = margin + (positions - low) / span * (np.array([width, height]) - 2 * margin)
+scaled_pos = scaled.tolist()
+
+# Bundled edges are drawn along polylines pulled towards similar edges
+edge_paths = None
+if edge_style == "bundled" and len(edges):
+    edge_paths = memoize(
+        "network_art.edge_bundles",
+        dict(graph_inputs, width=width, height=height),
+        lambda: bundle_edges(scaled[edges[:, 0]], scaled[edges[:, 1]]),
+    )
 
 # Draw edges
 edge_alpha_int = int(edge_alpha * 255)
-for edge in G.edges():
-    x1, y1 = scaled_pos[edge[0]]
-    x2, y2 = scaled_pos[edge[1]]
+for i, (u, v) in enumerate(edges.tolist()):
+    x1, y1 = scaled_pos[u]
+    x2, y2 = scaled_pos[v]
 
     color_idx = random.randint(0, len(palette) - 1)
     base_color = palette[color_idx]
@@ -127,10 +165,14 @@ for edge in G.edges():
     edge_color = (r, g, b, edge_alpha_int)
 
     thickness = int(edge_thickness.rvs())
-    draw.line([(x1, y1), (x2, y2)], fill=edge_color, width=thickness)
+    if edge_paths is None:
+        draw.line([(x1, y1), (x2, y2)], fill=edge_color, width=thickness)
+    else:
+        path = [tuple(point) for point in edge_paths[i].tolist()]
+        draw.line(path, fill=edge_color, width=thickness, joint="curve")
 
 # Draw nodes
-for node, (x, y) in scaled_pos.items():
+for x, y in scaled_pos:
     color_idx = random.randint(0, len(palette) - 1)
     node_color = palette[color_idx]
 
@@ -158,6 +200,6 @@ for node, (x, y) in scaled_pos.items():
     )
 
 # Convert to RGB
-img = img.convert("RGB")
+img = canvas.render("RGB")
 
 img
@@ -19,10 +19,17 @@ parameters:
   - name: colour
     distribution: choice
     values: ["#e94560", "#f39c12", "#00b894", "#6c5ce7", "#fd79a8", "#a29bfe"]
+  - name: layout
+    distribution: choice
+    values: ["single", "tiling"]
+  - name: board
+    distribution: choice
+    values: ["6x10", "5x12", "4x15", "3x20"]
 """
 
 from PIL import Image, ImageDraw
 import random
+from artlib.memo import effective_inputs
 
 random.seed(seed)
 
@@ -42,63 +49,184 @@ pentominoes = {
     'Z': [(0, 0), (0, 1), (1, 1), (2, 1), (2, 2)]
 }
 
-# Pick a random pentomino
-shape = random.choice(list(pentominoes.values()))
+
+def orientations(cells):
+    """Return every distinct rotation and reflection of a piece, normalised to (0, 0)."""
+    seen = []
+    for flip in (False, True):
+        points = [(row, -col) if flip else (row, col) for row, col in cells]
+        for _ in range(4):
+            points = [(col, -row) for row, col in points]
+            min_row = min(row for row, _ in points)
+            min_col = min(col for _, col in points)
+            shape = sorted((row - min_row, col - min_col) for row, col in points)
+            if shape not in seen:
+                seen.append(shape)
+    return seen
+
+
+def solve_tiling(rows, cols):
+    """Tile a rows x cols board with all 12 pentominoes (Algorithm X on bitboards).
+
+    The board is a bitmask of filled cells and every placement a mask of the
+    cells it covers. The search always fills the lowest empty cell, so only
+    placements whose lowest cell is that cell can fit; placements are indexed
+    by it. Cells are numbered along the short side to keep the fill front
+    short, and candidate lists are shuffled so each seed yields a different
+    solution.
+
+    Returns:
+        Dict mapping (row, col) to the name of the piece covering it.
+    """
+    def index(row, col):
+        return col * rows + row if rows <= cols else row * cols + col
+
+    names = list(pentominoes)
+    cell_of = {index(row, col): (row, col) for row in range(rows) for col in range(cols)}
+    by_lowest_cell = [[] for _ in range(rows * cols)]
+    for piece, name in enumerate(names):
+        for shape in orientations(pentominoes[name]):
+            shape_rows = max(row for row, _ in shape) + 1
+            shape_cols = max(col for _, col in shape) + 1
+            for row0 in range(rows - shape_rows + 1):
+                for col0 in range(cols - shape_cols + 1):
+                    mask = 0
+                    for row, col in shape:
+                        mask |= 1 << index(row0 + row, col0 + col)
+                    lowest = (mask & -mask).bit_length() - 1
+                    by_lowest_cell[lowest].append((piece, mask))
+    for candidates in by_lowest_cell:
+        random.shuffle(candidates)
+
+    full = (1 << (rows * cols)) - 1
+    placed = []
+
+    def search(filled, used):
+        if filled == full:
+            return True
+        empty = ~filled & full
+        cell = (empty & -empty).bit_length() - 1
+        for piece, mask in by_lowest_cell[cell]:
+            if used >> piece & 1 or mask & filled:
+                continue
+            placed.append((piece, mask))
+            if search(filled | mask, used | 1 << piece):
+                return True
+            placed.pop()
+        return False
+
+    if not search(0, 0):
+        raise ValueError(f"No pentomino tiling of a {rows}x{cols} board")
+
+    piece_at = {}
+    for piece, mask in placed:
+        while mask:
+            low = mask & -mask
+            piece_at[cell_of[low.bit_length() - 1]] = names[piece]
+            mask ^= low
+    return piece_at
+
+
+if layout == "tiling":
+    # Long side along the longer side of the image
+    rows, cols = sorted(int(side) for side in board.split("x"))
+    if height > width:
+        rows, cols = cols, rows
+    piece_at = solve_tiling(rows, cols)
+    shape = sorted(piece_at)
+
+    # The solution depends on the seed, so every seed is a distinct image
+    effective_inputs(
+        layout=layout,
+        board=board,
+        seed=seed,
+        colour=colour,
+        background=background,
+        width=width,
+        height=height,
+    )
+
+    # Fit the board inside a 20px margin
+    square_size = min((width - 40) // cols, (height - 40) // rows)
+    offset_x = (width - square_size * cols) // 2
+    offset_y = (height - square_size * rows) // 2
+else:
+    # Pick a random pentomino
+    shape_name = random.choice(list(pentominoes))
+    shape = pentominoes[shape_name]
+    piece_at = None
+
+    # Everything below depends only on these, so most seeds repeat an earlier image
+    effective_inputs(
+        layout=layout,
+        shape=shape_name,
+        colour=colour,
+        background=background,
+        width=width,
+        height=height,
+        square_size=square_size,
+    )
+
+    # Centre the pentomino
+    offset_x = (width - square_size * 3) // 2
+    offset_y = (height - square_size * 5) // 2
+
+line_width = max(2, round(square_size * 5 / 60))
 
 # Create image
 img = Image.new("RGB", (width, height), background)
 draw = ImageDraw.Draw(img)
 
-# Centre the pentomino
-offset_x = (width - square_size * 3) // 2
-offset_y = (height - square_size * 5) // 2
-
 # Draw the pentomino (filled squares first)
 for row, col in shape:
     x = offset_x + col * square_size
     y = offset_y + row * square_size
     draw.rectangle([x, y, x + square_size, y + square_size], fill=colour)
 
-# Draw grid lines (each edge only once)
+# Draw grid lines (each edge only once). In a tiling, edges between two cells
+# of the same piece are skipped so only the piece boundaries are outlined.
 drawn_edges = set()
 corner_points = set()
 
+
+def same_piece(cell, neighbour):
+    return piece_at is not None and piece_at.get(cell) == piece_at.get(neighbour)
+
+
 for row, col in shape:
     x = offset_x + col * square_size
     y = offset_y + row * square_size
 
-    # Collect corner points
-    corner_points.add((x, y))
-    corner_points.add((x + square_size, y))
-    corner_points.add((x, y + square_size))
-    corner_points.add((x + square_size, y + square_size))
-
     # Top edge
     edge = ('h', row, col, col + 1)
-    if edge not in drawn_edges:
-        draw.line([x, y, x + square_size, y], fill="#000000", width=5, joint="curve")
+    if edge not in drawn_edges and not same_piece((row, col), (row - 1, col)):
+        draw.line([x, y, x + square_size, y], fill="#000000", width=line_width, joint="curve")
         drawn_edges.add(edge)
+        corner_points.update([(x, y), (x + square_size, y)])
 
     # Bottom edge
     edge = ('h', row + 1, col, col + 1)
-    if edge not in drawn_edges:
-        draw.line([x, y + square_size, x + square_size, y + square_size], fill="#000000", width=5, joint="curve")
+    if edge not in drawn_edges and not same_piece((row, col), (row + 1, col)):
+        draw.line([x, y + square_size, x + square_size, y + square_size], fill="#000000", width=line_width, joint="curve")
         drawn_edges.add(edge)
+        corner_points.update([(x, y + square_size), (x + square_size, y + square_size)])
 
     # Left edge
     edge = ('v', col, row, row + 1)
-    if edge not in drawn_edges:
-        draw.line([x, y, x, y + square_size], fill="#000000", width=5, joint="curve")
+    if edge not in drawn_edges and not same_piece((row, col), (row, col - 1)):
+        draw.line([x, y, x, y + square_size], fill="#000000", width=line_width, joint="curve")
         drawn_edges.add(edge)
+        corner_points.update([(x, y), (x, y + square_size)])
 
     # Right edge
     edge = ('v', col + 1, row, row + 1)
-    if edge not in drawn_edges:
-        draw.line([x + square_size, y, x + square_size, y + square_size], fill="#000000", width=5, joint="curve")
+    if edge not in drawn_edges and not same_piece((row, col), (row, col + 1)):
+        draw.line([x + square_size, y, x + square_size, y + square_size], fill="#000000", width=line_width, joint="curve")
         drawn_edges.add(edge)
+        corner_points.update([(x + square_size, y), (x + square_size, y + square_size)])
 
 # Draw circles at corners to fill gaps and create rounded joins
-radius = 2.5
+radius = line_width / 2
 for px, py in corner_points:
     draw.ellipse([px - radius, py - radius, px + radius, py + radius], fill="#000000")
 
@@ -55,11 +55,18 @@ parameters:
     ]
 """
 
-from PIL import Image, ImageDraw, ImageFilter, ImageOps, ImageEnhance
+from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageOps, ImageEnhance
 import random
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 import math
+from artlib.shared import shared_image
+
+def download_image(url):
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+    return Image.open(BytesIO(response.content)).convert("RGB")
 
 # Use specific image IDs for consistent results
 def fetch_image(width, height, image_id):
@@ -68,9 +75,9 @@ def fetch_image(width, height, image_id):
     img_id = image_id % 1000
     url = f"https://picsum.photos/id/{img_id}/{width}/{height}"
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return Image.open(BytesIO(response.content)).convert("RGB")
+        # Sources depend only on the URL, so load them once and share them
+        # between samples (and batch workers, as read-only images)
+        return shared_image("remix.source", {"url": url}, lambda: download_image(url))
     except Exception:
         # Fallback
         return Image.new("RGB", (width, height),
@@ -89,44 +96,82 @@ for i in range(3):
 
 canvas = Image.new("RGB", (width, height), "black")
 
-def apply_colour_effect(img, mode, palette):
+def plan_colour_effect(mode):
+    """Draw the random values apply_colour_effect needs, in the original order."""
+    if mode == "solarize":
+        return {"threshold": random.randint(60, 180)}
+    elif mode == "channel_swap":
+        # Swap RGB channels randomly
+        order = [0, 1, 2]
+        random.shuffle(order)
+        return {"order": order}
+    elif mode == "extreme_contrast":
+        return {"contrast": random.uniform(2.0, 4.0), "colour": random.uniform(1.5, 3.0)}
+    elif mode == "chromatic":
+        return {"offset": random.randint(10, 40)}
+    return {}
+
+def apply_colour_effect(img, mode, palette, plan):
     if mode == "invert":
         return ImageOps.invert(img)
     elif mode == "solarize":
-        return ImageOps.solarize(img, threshold=random.randint(60, 180))
+        return ImageOps.solarize(img, threshold=plan["threshold"])
     elif mode == "channel_swap":
-        # Swap RGB channels randomly
-        r, g, b = img.split()
-        channels = [r, g, b]
-        random.shuffle(channels)
-        return Image.merge("RGB", tuple(channels))
+        channels = img.split()
+        return Image.merge("RGB", tuple(channels[i] for i in plan["order"]))
     elif mode == "extreme_contrast":
         # Extreme contrast and saturation
         img_copy = img.copy()
         enhancer = ImageEnhance.Contrast(img_copy)
-        img_copy = enhancer.enhance(random.uniform(2.0, 4.0))
+        img_copy = enhancer.enhance(plan["contrast"])
         enhancer = ImageEnhance.Color(img_copy)
-        img_copy = enhancer.enhance(random.uniform(1.5, 3.0))
+        img_copy = enhancer.enhance(plan["colour"])
         return img_copy
     elif mode == "chromatic":
         # Chromatic aberration effect
-        from PIL import ImageChops
         r, g, b = img.split()
-        offset = random.randint(10, 40)
+        offset = plan["offset"]
         r = ImageChops.offset(r, offset, 0)
         b = ImageChops.offset(b, -offset, 0)
         return Image.merge("RGB", (r, g, b))
     return img
 
-def apply_effect(img, effect):
+def plan_effect(effect):
+    """Draw the random values apply_effect needs, in the original order."""
+    if effect == "heavy_glitch":
+        return {"offsets": [
+            (random.randint(-60, 60), random.randint(-20, 20)),
+            (random.randint(-30, 30), random.randint(-20, 20)),
+            (random.randint(-60, 60), random.randint(-20, 20)),
+        ]}
+    elif effect == "mirror":
+        return {"mirror": random.random() > 0.5}
+    elif effect == "displace":
+        num_slices = random.randint(5, 15)
+        return {"offsets": [random.randint(-100, 100) for _ in range(num_slices)]}
+    elif effect == "liquify":
+        intensity = random.uniform(0.3, 0.8)
+        # Perspective transform with random coefficients
+        return {"coeffs": [
+            1 + random.uniform(-intensity, intensity),
+            random.uniform(-intensity * 0.5, intensity * 0.5),
+            random.randint(-50, 50),
+            random.uniform(-intensity * 0.5, intensity * 0.5),
+            1 + random.uniform(-intensity, intensity),
+            random.randint(-50, 50),
+            random.uniform(-0.001, 0.001),
+            random.uniform(-0.001, 0.001)
+        ]}
+    return {}
+
+def apply_effect(img, effect, plan):
     if effect == "heavy_glitch":
         # Heavy RGB channel shift with blocks
-        from PIL import ImageChops
-        r, g, b = img.split()
-        r = ImageChops.offset(r, random.randint(-60, 60), random.randint(-20, 20))
-        g = ImageChops.offset(g, random.randint(-30, 30), random.randint(-20, 20))
-        b = ImageChops.offset(b, random.randint(-60, 60), random.randint(-20, 20))
-        return Image.merge("RGB", (r, g, b))
+        channels = img.split()
+        return Image.merge("RGB", tuple(
+            ImageChops.offset(channel, dx, dy)
+            for channel, (dx, dy) in zip(channels, plan["offsets"])
+        ))
     elif effect == "kaleidoscope":
         # Kaleidoscope effect - flip and rotate quadrants
         w, h = img.size
@@ -144,7 +189,7 @@ def apply_effect(img, effect):
         return result
     elif effect == "mirror":
         # Random mirror effect
-        if random.random() > 0.5:
+        if plan["mirror"]:
             return ImageOps.mirror(img)
         else:
             return ImageOps.flip(img)
@@ -152,32 +197,16 @@ def apply_effect(img, effect):
         # Displacement/slice effect
         w, h = img.size
         result = img.copy()
-        num_slices = random.randint(5, 15)
-        slice_height = h // num_slices
-        for i in range(num_slices):
+        slice_height = h // len(plan["offsets"])
+        for i, offset_x in enumerate(plan["offsets"]):
             y = i * slice_height
             slice_img = result.crop((0, y, w, min(y + slice_height, h)))
-            offset_x = random.randint(-100, 100)
-            from PIL import ImageChops
             slice_img = ImageChops.offset(slice_img, offset_x, 0)
             result.paste(slice_img, (0, y))
         return result
     elif effect == "liquify":
         # Liquify/warp effect
-        w, h = img.size
-        intensity = random.uniform(0.3, 0.8)
-        # Perspective transform with random coefficients
-        coeffs = [
-            1 + random.uniform(-intensity, intensity),
-            random.uniform(-intensity * 0.5, intensity * 0.5),
-            random.randint(-50, 50),
-            random.uniform(-intensity * 0.5, intensity * 0.5),
-            1 + random.uniform(-intensity, intensity),
-            random.randint(-50, 50),
-            random.uniform(-0.001, 0.001),
-            random.uniform(-0.001, 0.001)
-        ]
-        return img.transform(img.size, Image.PERSPECTIVE, coeffs, Image.BICUBIC)
+        return img.transform(img.size, Image.PERSPECTIVE, plan["coeffs"], Image.BICUBIC)
     return img
 
 def warp_image(img, intensity):
@@ -191,10 +220,8 @@ def warp_image(img, intensity):
 
 def blend_images(base, overlay, mode):
     if mode == "multiply":
-        from PIL import ImageChops
         return ImageChops.multiply(base, overlay)
     elif mode == "screen":
-        from PIL import ImageChops
         return ImageChops.screen(base, overlay)
     elif mode == "overlay":
         return Image.blend(base, overlay, 0.5)
@@ -213,41 +240,58 @@ blend = blend_mode.rvs() if hasattr(blend_mode, 'rvs') else blend_mode
 if comp == "strips":
     # Horizontal or vertical strips
     strip_height = max(50, p_size)
-    y_pos = 0
-    while y_pos < height:
+    plans = []
+    for y_pos in range(0, height, strip_height):
         img_idx = random.randint(0, 2)
-        img = source_images[img_idx].copy()
+        plans.append((y_pos, img_idx, plan_colour_effect(col_mode), plan_effect(effect)))
+
+    def make_strip(plan):
+        y_pos, img_idx, colour_plan, effect_plan = plan
+        img = source_images[img_idx].convert("RGB")
 
         # Apply effects
-        img = apply_colour_effect(img, col_mode, colour_palette)
-        img = apply_effect(img, effect)
+        img = apply_colour_effect(img, col_mode, colour_palette, colour_plan)
+        img = apply_effect(img, effect, effect_plan)
         img = warp_image(img, warp_int)
 
         # Crop strip
-        strip = img.crop((0, y_pos, width, min(y_pos + strip_height, height)))
-        canvas.paste(strip, (0, y_pos))
+        return img.crop((0, y_pos, width, min(y_pos + strip_height, height)))
 
-        y_pos += strip_height
+    # Pieces are independent, and Pillow releases the GIL while processing
+    # them; pasting stays in order here
+    with ThreadPoolExecutor() as pool:
+        for (y_pos, *_), strip in zip(plans, pool.map(make_strip, plans)):
+            canvas.paste(strip, (0, y_pos))
 
 elif comp == "grid":
     # Grid of pieces
     grid_size = max(50, p_size)
+    plans = []
     for y in range(0, height, grid_size):
         for x in range(0, width, grid_size):
             img_idx = random.randint(0, 2)
-            img = source_images[img_idx].copy()
+            colour_plan = plan_colour_effect(col_mode)
+            effect_plan = plan_effect(effect)
+            # Maybe rotate
+            rotate = random.random() > 0.5
+            plans.append((x, y, img_idx, colour_plan, effect_plan, rotate))
 
-            # Apply effects
-            img = apply_colour_effect(img, col_mode, colour_palette)
-            img = apply_effect(img, effect)
+    def make_piece(plan):
+        x, y, img_idx, colour_plan, effect_plan, rotate = plan
+        img = source_images[img_idx].convert("RGB")
 
-            # Crop piece
-            piece = img.crop((x, y, min(x + grid_size, width), min(y + grid_size, height)))
+        # Apply effects
+        img = apply_colour_effect(img, col_mode, colour_palette, colour_plan)
+        img = apply_effect(img, effect, effect_plan)
 
-            # Maybe rotate
-            if random.random() > 0.5:
-                piece = piece.rotate(rotation, expand=False)
+        # Crop piece
+        piece = img.crop((x, y, min(x + grid_size, width), min(y + grid_size, height)))
+        if rotate:
+            piece = piece.rotate(rotation, expand=False)
+        return piece
 
+    with ThreadPoolExecutor() as pool:
+        for (x, y, *_), piece in zip(plans, pool.map(make_piece, plans)):
             canvas.paste(piece, (x, y))
 
 elif comp == "triangles":
@@ -256,11 +300,11 @@ elif comp == "triangles":
 
     for _ in range(num_triangles):
         img_idx = random.randint(0, 2)
-        img = source_images[img_idx].copy()
+        img = source_images[img_idx].convert("RGB")
 
         # Apply effects
-        img = apply_colour_effect(img, col_mode, colour_palette)
-        img = apply_effect(img, effect)
+        img = apply_colour_effect(img, col_mode, colour_palette, plan_colour_effect(col_mode))
+        img = apply_effect(img, effect, plan_effect(effect))
 
         # Random triangle
         x1, y1 = random.randint(0, width), random.randint(0, height)
@@ -284,11 +328,11 @@ elif comp == "diagonal":
 
     for i in range(num_strips):
         img_idx = random.randint(0, 2)
-        img = source_images[img_idx].copy()
+        img = source_images[img_idx].convert("RGB")
 
         # Apply effects
-        img = apply_colour_effect(img, col_mode, colour_palette)
-        img = apply_effect(img, effect)
+        img = apply_colour_effect(img, col_mode, colour_palette, plan_colour_effect(col_mode))
+        img = apply_effect(img, effect, plan_effect(effect))
         img = warp_image(img, warp_int)
 
         # Create diagonal mask
@@ -316,11 +360,11 @@ else:  # spiral
 
     while radius < max(width, height):
         img_idx = random.randint(0, 2)
-        img = source_images[img_idx].copy()
+        img = source_images[img_idx].convert("RGB")
 
         # Apply effects
-        img = apply_colour_effect(img, col_mode, colour_palette)
-        img = apply_effect(img, effect)
+        img = apply_colour_effect(img, col_mode, colour_palette, plan_colour_effect(col_mode))
+        img = apply_effect(img, effect, plan_effect(effect))
 
         # Calculate position
         x = int(center_x + radius * math.cos(angle))
@@ -340,8 +384,8 @@ else:  # spiral
 
 # Apply final blend if needed
 if blend != "normal":
-    overlay_img = source_images[random.randint(0, 2)].copy()
-    overlay_img = apply_effect(overlay_img, effect)
+    overlay_img = source_images[random.randint(0, 2)].convert("RGB")
+    overlay_img = apply_effect(overlay_img, effect, plan_effect(effect))
     canvas = blend_images(canvas, overlay_img, blend)
 
 canvas
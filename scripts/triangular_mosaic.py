@@ -34,33 +34,266 @@ parameters:
     low: 0
     high: 3
     mode: distribution
+  - name: colouring
+    distribution: choice
+    values: ["palette", "image"]
+  - name: source_image_id
+    distribution: randint
+    low: 0
+    high: 1000
+  - name: placement
+    distribution: choice
+    values: ["random", "adaptive"]
+  - name: target_error
+    distribution: uniform
+    loc: 8
+    scale: 10
+  - name: max_points
+    distribution: constant
+    value: 4000
 """
 
 from PIL import Image, ImageDraw
+import heapq
 import random
+import numpy as np
+import requests
+from io import BytesIO
 from scipy.spatial import Delaunay
+from artlib.cache import memoize
+from artlib.sampling import pooled
+
+
+def download_image(url):
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+    return Image.open(BytesIO(response.content)).convert("RGB")
+
+
+def label_image(triangles):
+    """Rasterise triangles, given as lists of corner points, into a label array.
+
+    Each pixel holds the index of the last triangle covering it plus one, or 0
+    where no triangle does.
+    """
+    image = Image.new("I", (width, height), 0)
+    label_draw = ImageDraw.Draw(image)
+    for label, corners in enumerate(triangles, 1):
+        label_draw.polygon([tuple(c) for c in corners], fill=label)
+    return np.asarray(image)
+
+
+def triangle_colours(tri, source):
+    """Mean colour of ``source`` under each triangle, as a (triangles, 3) uint8 array.
+
+    The triangles are rasterised into one label image, then a single
+    np.bincount over (label, channel) pairs sums every channel per triangle,
+    so the cost is O(pixels + triangles). Triangles too thin to cover a pixel
+    take the colour under their centroid.
+    """
+    labels = label_image(tri.points[tri.simplices].tolist()).ravel()
+    pixels = np.asarray(source, dtype=np.float64).reshape(-1, 3)
+
+    # Label 0 (no triangle) collects the uncovered pixels and is dropped
+    count = len(tri.simplices) + 1
+    counts = np.bincount(labels, minlength=count)[1:]
+    bins = (labels[:, None] * 3 + np.arange(3)).ravel()
+    sums = np.bincount(bins, weights=pixels.ravel(), minlength=count * 3).reshape(count, 3)[1:]
+    centroids = tri.points[tri.simplices].mean(axis=1)
+    cx = np.clip(centroids[:, 0].astype(int), 0, width - 1)
+    cy = np.clip(centroids[:, 1].astype(int), 0, height - 1)
+    under_centroid = np.asarray(source)[cy, cx]
+    means = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], under_centroid)
+    return np.rint(means).astype(np.uint8)
+
+
+def adaptive_triangulation(source):
+    """Refine a coarse triangulation where it matches ``source`` worst.
+
+    Starts from the canvas corners plus ``num_points`` random points, then
+    repeatedly inserts, into the triangles with the largest colour error, the
+    pixel that deviates most from the triangle's mean. Points go into a single
+    incremental qhull triangulation, and a heap keyed on error holds every
+    triangle: after each round only the triangles that appeared are measured,
+    and heap entries of triangles that have gone are skipped when popped.
+    Stops once the RMS error per channel reaches ``target_error`` or the mesh
+    has ``max_points`` points.
+    """
+    image = np.asarray(source, dtype=np.float64)
+    # Own generator, so cached and fresh runs leave the global sequence alike
+    rng = np.random.default_rng(seed)
+    corners = [[0, 0], [width, 0], [0, height], [width, height]]
+    start = np.vstack([corners, rng.uniform([0, 0], [width, height], size=(num_points, 2))])
+    mesh = Delaunay(start, incremental=True)
+    # Pixels whose centre is already a vertex; inserting one again is a no-op
+    is_vertex = np.zeros((height, width), dtype=bool)
+
+    def simplex_keys(simplices):
+        # One integer per triangle, whatever order qhull lists its vertices in
+        ordered = np.sort(simplices, axis=1).astype(np.int64)
+        return (ordered[:, 0] << 42) | (ordered[:, 1] << 21) | ordered[:, 2]
+
+    heap = []
+    alive = {}
+    total = 0.0
+
+    def measure(new, keys):
+        """Measure the simplices at indices ``new`` (keyed ``keys``) together:
+        scan-convert each one over the rows of its bounding box, then reduce
+        the pixels found with np.bincount. Cost follows the new triangles'
+        area, not the frame."""
+        nonlocal total
+        corners = mesh.points[mesh.simplices[new]]
+        # Anticlockwise on screen, so every interior lies left of its edges
+        (ax, ay), (bx, by), (cx, cy) = corners[:, 0].T, corners[:, 1].T, corners[:, 2].T
+        flip = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax) < 0
+        corners[flip] = corners[flip][:, ::-1]
+        top = np.clip(np.floor(corners[:, :, 1].min(axis=1)).astype(int), 0, height)
+        bottom = np.clip(np.ceil(corners[:, :, 1].max(axis=1)).astype(int), 0, height)
+
+        # One entry per (triangle, row), with the row's span of pixel centres
+        rows = bottom - top
+        owner = np.repeat(np.arange(len(new)), rows)
+        y = top[owner] + np.arange(rows.sum()) - np.repeat(np.cumsum(rows) - rows, rows)
+        yc = y + 0.5
+        first = np.zeros(len(y), dtype=int)
+        last = np.full(len(y), width - 1)
+        for k in range(3):
+            start, end = corners[owner, k], corners[owner, (k + 1) % 3]
+            dx, dy = (end - start).T
+            # Crossing computed from the upper endpoint, so both triangles
+            # sharing an edge get the same value
+            upper = np.where((dy > 0)[:, None], start, end)
+            lower = np.where((dy > 0)[:, None], end, start)
+            sloped = dy != 0
+            t = upper[:, 0] + (lower[:, 0] - upper[:, 0]) * (yc - upper[:, 1]) / np.where(sloped, lower[:, 1] - upper[:, 1], 1)
+            # Centres exactly on an edge go to the triangle it runs down
+            first = np.where(dy < 0, np.maximum(first, np.floor(t - 0.5).astype(int) + 1), first)
+            last = np.where(dy > 0, np.minimum(last, np.floor(t - 0.5).astype(int)), last)
+            side = dx * (yc - start[:, 1])
+            flat = ~sloped & ~((side > 0) | ((side == 0) & (dx < 0)))
+            last[flat] = -1
+        spans = np.maximum(last - first + 1, 0)
+        labels = np.repeat(owner, spans)
+        ys = np.repeat(y, spans)
+        xs = np.repeat(first, spans) + np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans)
+        pixels = image[ys, xs]
+
+        count = np.maximum(np.bincount(labels, minlength=len(new)), 1)
+        sums = np.stack([np.bincount(labels, pixels[:, c], len(new)) for c in range(3)], axis=1)
+        deviation = ((pixels - (sums / count[:, None])[labels]) ** 2).sum(axis=1)
+        errors = np.bincount(labels, deviation, len(new))
+        # Worst pixel of each triangle, skipping pixels that are vertices already
+        deviation[is_vertex[ys, xs]] = -1
+        largest = np.full(len(new), -1.0)
+        np.maximum.at(largest, labels, deviation)
+        at_max = np.flatnonzero((deviation == largest[labels]) & (deviation > 0))
+        worst = np.full(len(new), -1)
+        worst[labels[at_max]] = at_max
+
+        for i, key in enumerate(keys.tolist()):
+            alive[key] = errors[i]
+            total += errors[i]
+            if worst[i] >= 0:
+                heapq.heappush(heap, (-errors[i], key, (xs[worst[i]] + 0.5, ys[worst[i]] + 0.5)))
+
+    alive_keys = simplex_keys(mesh.simplices)
+    measure(np.arange(len(alive_keys)), alive_keys)
+    target_total = target_error ** 2 * 3 * width * height
+    while total > target_total and len(mesh.points) < max_points and heap:
+        # The worst twentieth of the triangles gets a new point each round
+        batch = set()
+        popped = set()
+        while heap and len(batch) < max(1, len(alive) // 20):
+            _, key, worst = heapq.heappop(heap)
+            if key in alive:
+                batch.add(worst)
+                popped.add(key)
+        if not batch:
+            break
+        before = len(mesh.points)
+        added = np.array(sorted(batch))
+        is_vertex[(added[:, 1] - 0.5).astype(int), (added[:, 0] - 0.5).astype(int)] = True
+        mesh.add_points(added)
+        if len(mesh.points) == before:
+            break
+        keys = simplex_keys(mesh.simplices)
+        # Gone triangles leave; popped ones that survived (their pixel landed
+        # just outside them) are measured again so they stay in the heap.
+        # Every other triangle keeps its error.
+        popped = np.array(sorted(popped), dtype=np.int64)
+        survived = popped[np.isin(popped, keys)]
+        for key in np.concatenate([alive_keys[~np.isin(alive_keys, keys)], survived]).tolist():
+            total -= alive.pop(key)
+        new = np.flatnonzero(~np.isin(keys, alive_keys) | np.isin(keys, survived))
+        measure(new, keys[new])
+        alive_keys = keys
+
+    mesh.close()
+    return mesh
+
 
 random.seed(seed)
+stroke_width = pooled(stroke_width)
 
 img = Image.new("RGBA", (width, height), background)
 draw = ImageDraw.Draw(img)
 
-# Generate random points
-points = []
-for _ in range(num_points):
-    x = random.uniform(-width * 0.2, width * 1.2)
-    y = random.uniform(-height * 0.2, height * 1.2)
-    points.append([x, y])
+# Source photo for image colouring and adaptive placement, if it can be fetched
+source = None
+if colouring == "image" or placement == "adaptive":
+    url = f"https://picsum.photos/id/{source_image_id}/{width}/{height}"
+    try:
+        # Sources depend only on the URL, so reuse them across samples
+        source = memoize("triangular_mosaic.source", {"url": url}, lambda: download_image(url))
+    except Exception:
+        # Fall back to random points and the palette
+        pass
+
+if placement == "adaptive" and source is not None:
+    tri = memoize(
+        "triangular_mosaic.adaptive",
+        {
+            "url": url,
+            "seed": seed,
+            "num_points": num_points,
+            "target_error": target_error,
+            "max_points": max_points,
+            "width": width,
+            "height": height,
+        },
+        lambda: adaptive_triangulation(source),
+    )
+    points = tri.points.tolist()
+else:
+    # Generate random points
+    points = []
+    for _ in range(num_points):
+        x = random.uniform(-width * 0.2, width * 1.2)
+        y = random.uniform(-height * 0.2, height * 1.2)
+        points.append([x, y])
+
+    # Create Delaunay triangulation (points are determined by these inputs)
+    tri = memoize(
+        "triangular_mosaic.delaunay",
+        {"seed": seed, "num_points": num_points, "width": width, "height": height},
+        lambda: Delaunay(points),
+    )
 
-# Create Delaunay triangulation
-tri = Delaunay(points)
+# Low-poly colouring from the source photo
+triangle_rgb = None
+if colouring == "image" and source is not None:
+    triangle_rgb = triangle_colours(tri, source)
 
 # Draw triangles
-for simplex in tri.simplices:
+for index, simplex in enumerate(tri.simplices):
     triangle = [tuple(points[i]) for i in simplex]
 
-    # Pick random colour from palette
-    colour = random.choice(palette)
+    if triangle_rgb is None:
+        # Pick random colour from palette
+        colour = random.choice(palette)
+    else:
+        colour = "#%02x%02x%02x" % tuple(triangle_rgb[index])
 
     # Calculate alpha
     alpha = int(255 * triangle_alpha)